@@ -0,0 +1,140 @@
+import os
+import hashlib
+import struct
+import threading
+import pygame
+
+CACHE_VERSION = 1
+_HEADER = struct.Struct('<4sHII')
+_MAGIC = b'BSAC'
+
+
+# Loads every image once per process, keyed by (path, target size, alpha mode, flip),
+# so screens that open again or share files (bg.png, icons) reuse the same surface.
+# Scaled pixel data is also written to an on-disk cache so a cold start can skip
+# PNG/WebP decoding and scaling and only has to convert to the display format.
+class AssetManager:
+    def __init__(self, cache_dir='.asset_cache', disk_cache=True):
+        self.cache_dir = cache_dir
+        self.disk_cache = disk_cache
+        self.images = {}
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    def key(self, path, width=None, size=None, alpha=True, flip_x=False):
+        if size is not None:
+            spec = ('size', int(size[0]), int(size[1]))
+        elif width is not None:
+            spec = ('width', int(width))
+        else:
+            spec = ('native',)
+        return (path, spec, alpha, flip_x)
+
+    def image(self, path, width=None, size=None, alpha=True, flip_x=False):
+        key = self.key(path, width, size, alpha, flip_x)
+        surface = self.images.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+        self.misses += 1
+        return self.store(key, self.load(key))
+
+    # Decoding half of image(); touches no display state, so it can run on a worker thread
+    def load(self, key):
+        surface = self._load_from_disk(key)
+        if surface is None:
+            path, spec, alpha, flip_x = key
+            surface = self._decode(path, spec, alpha, flip_x)
+            self._save_to_disk(key, surface, alpha)
+        else:
+            self.disk_hits += 1
+        return surface
+
+    # Converting half of image(); must run on the thread that owns the display
+    def store(self, key, surface):
+        surface = self._to_display_format(surface, key[2])
+        self.images[key] = surface
+        return surface
+
+    def stats(self):
+        return {'entries': len(self.images), 'hits': self.hits, 'misses': self.misses, 'disk_hits': self.disk_hits}
+
+    def clear(self):
+        self.images.clear()
+        self.hits = self.misses = self.disk_hits = 0
+
+    def _decode(self, path, spec, alpha, flip_x):
+        surface = pygame.image.load(path)
+        if spec[0] == 'size':
+            surface = pygame.transform.scale(surface, (spec[1], spec[2]))
+        elif spec[0] == 'width':
+            surface = pygame.transform.scale(surface, scaled_size(surface.get_size(), spec[1]))
+        if flip_x:
+            surface = pygame.transform.flip(surface, True, False)
+        return surface
+
+    def _to_display_format(self, surface, alpha):
+        # convert() needs a display mode; headless callers keep the plain surface
+        if not pygame.display.get_init() or pygame.display.get_surface() is None:
+            return surface
+        return surface.convert_alpha() if alpha else surface.convert()
+
+    def _cache_path(self, key):
+        path = key[0]
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        digest = hashlib.sha1(repr((CACHE_VERSION, key, stat.st_mtime_ns, stat.st_size)).encode()).hexdigest()
+        return os.path.join(self.cache_dir, digest + '.raw')
+
+    def _load_from_disk(self, key):
+        if not self.disk_cache:
+            return None
+        cache_path = self._cache_path(key)
+        if cache_path is None or not os.path.exists(cache_path):
+            return None
+        try:
+            with open(cache_path, 'rb') as f:
+                magic, version, w, h = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != _MAGIC or version != CACHE_VERSION:
+                    return None
+                fmt = 'RGBA' if key[2] else 'RGB'
+                return pygame.image.fromstring(f.read(), (w, h), fmt)
+        except (OSError, ValueError, struct.error, pygame.error):
+            return None
+
+    def _save_to_disk(self, key, surface, alpha):
+        if not self.disk_cache:
+            return
+        cache_path = self._cache_path(key)
+        if cache_path is None:
+            return
+        fmt = 'RGBA' if alpha else 'RGB'
+        try:
+            write_atomic(cache_path, _HEADER.pack(_MAGIC, CACHE_VERSION, *surface.get_size()), pygame.image.tostring(surface, fmt))
+        except OSError as e:
+            print(f"Could not write asset cache for {key[0]}: {e}")
+
+
+# Writes the chunks to a temporary file and renames it over path, so a reader never sees
+# a half-written file; used by the on-disk caches. The temporary name is unique per
+# writer, since preload workers may write the same entry at once. Raises OSError.
+def write_atomic(path, *chunks):
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(tmp_path, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp_path, path)
+
+
+# (new_width, height) keeping the aspect ratio, in whole pixels; images
+# loaded with width= are scaled to this
+def scaled_size(source_size, new_width):
+    return (new_width, int(source_size[1] * new_width / source_size[0]))
+
+
+# Shared asset manager
+global_asset_manager = AssetManager()
@@ -0,0 +1,179 @@
+import argparse
+import csv
+import json
+import os
+import random
+import statistics
+import time
+from multiprocessing import Pool
+
+from engine import GameEngine, BACKENDS, ACTION_UP, ACTION_DOWN, ACTION_SHOOT
+
+# Runs many seeded headless episodes across a process pool and aggregates how long
+# players survive, what they score and what kills them at each difficulty level.
+# Every episode is fully determined by its seed, so a report can be reproduced.
+#
+#   python batch_runner.py --episodes 5000 --policy scripted --json report.json --csv episodes.csv
+
+
+# Policies get the engine and their own seeded Random and return an action bitmask
+def random_policy(engine, rng):
+    return rng.randrange(8)
+
+
+def idle_policy(engine, rng):
+    return 0
+
+
+def scripted_policy(engine, rng):
+    player = engine.player.rect
+    actions = ACTION_SHOOT
+    # dodge the closest cloud ahead of us, otherwise line up with the closest bird
+    threats = [rect for rect in engine.rects('cloud') if rect.right > player.left and rect.left < player.right + 150]
+    if threats:
+        threat = min(threats, key=lambda rect: rect.left)
+        if abs(threat.centery - player.centery) < (threat.height + player.height) // 2 + 10:
+            actions |= ACTION_UP if threat.centery > player.centery else ACTION_DOWN
+        return actions
+    birds = [rect for rect in engine.rects('bird') if rect.left > player.right]
+    if birds:
+        target = min(birds, key=lambda rect: rect.left).centery
+        if target < player.centery - 4:
+            actions |= ACTION_UP
+        elif target > player.centery + 4:
+            actions |= ACTION_DOWN
+    return actions
+
+
+POLICIES = {
+    'random': random_policy,
+    'idle': idle_policy,
+    'scripted': scripted_policy,
+}
+
+
+def run_episode(args):
+    seed, policy_name, max_ticks, backend = args
+    policy = POLICIES[policy_name]
+    engine = GameEngine(backend=backend)
+    engine.reset(seed)
+    rng = random.Random(seed ^ 0x5EED)
+
+    damage = {}  # (difficulty_level, cause) -> hits taken
+    death_cause = None
+    while not engine.game_over and engine.ticks < max_ticks:
+        for event in engine.step(policy(engine, rng)):
+            if event.kind == 'collision':
+                key = (engine.difficulty_level, event.detail)
+                damage[key] = damage.get(key, 0) + 1
+                death_cause = event.detail
+
+    return {
+        'seed': seed,
+        'policy': policy_name,
+        'score': engine.player.score,
+        'survival_s': round(engine.time / 1000, 3),
+        'level': engine.difficulty_level,
+        'died': engine.game_over,
+        'death_cause': death_cause if engine.game_over else '',
+        'damage': {f'{level}:{cause}': count for (level, cause), count in damage.items()},
+    }
+
+
+def percentile(values, pct):
+    if not values:
+        return 0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(results):
+    scores = [r['score'] for r in results]
+    survival = [r['survival_s'] for r in results]
+
+    deaths_by_level = {}
+    damage_by_level = {}
+    for r in results:
+        if r['died']:
+            level = deaths_by_level.setdefault(str(r['level']), {'bird': 0, 'cloud': 0})
+            level[r['death_cause']] += 1
+        for key, count in r['damage'].items():
+            level_name, cause = key.split(':')
+            level = damage_by_level.setdefault(level_name, {'bird': 0, 'cloud': 0})
+            level[cause] += count
+
+    histogram = {}
+    for score in scores:
+        bucket = f'{score // 10 * 10}-{score // 10 * 10 + 9}'
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+
+    def stats(values):
+        return {
+            'mean': round(statistics.fmean(values), 3) if values else 0,
+            'median': percentile(values, 50),
+            'p10': percentile(values, 10),
+            'p90': percentile(values, 90),
+            'max': max(values) if values else 0,
+        }
+
+    return {
+        'episodes': len(results),
+        'deaths': sum(1 for r in results if r['died']),
+        'score': stats(scores),
+        'survival_s': stats(survival),
+        'score_histogram': dict(sorted(histogram.items(), key=lambda item: int(item[0].split('-')[0]))),
+        'deaths_by_level': dict(sorted(deaths_by_level.items(), key=lambda item: int(item[0]))),
+        'damage_by_level': dict(sorted(damage_by_level.items(), key=lambda item: int(item[0]))),
+    }
+
+
+def write_csv(path, results):
+    fields = ['seed', 'policy', 'score', 'survival_s', 'level', 'died', 'death_cause']
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def run_batch(episodes, policy='scripted', seed=0, workers=None, max_seconds=600, tick_rate=120, backend='sprites'):
+    max_ticks = int(max_seconds * tick_rate)
+    jobs = [(seed + i, policy, max_ticks, backend) for i in range(episodes)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [run_episode(job) for job in jobs]
+    with Pool(workers) as pool:
+        # results come back in seed order regardless of which worker ran them
+        return pool.map(run_episode, jobs, chunksize=max(1, episodes // (workers * 8)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run seeded headless episodes and report difficulty statistics.')
+    parser.add_argument('--episodes', type=int, default=1000)
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='scripted')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first episode; episode i uses seed + i')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--max-seconds', type=float, default=600, help='simulated time limit per episode')
+    parser.add_argument('--json', dest='json_path', help='write the summary report here')
+    parser.add_argument('--csv', dest='csv_path', help='write one row per episode here')
+    parser.add_argument('--backend', choices=BACKENDS, default='sprites', help='engine entity backend')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = run_batch(args.episodes, args.policy, args.seed, args.workers, args.max_seconds, backend=args.backend)
+    elapsed = time.perf_counter() - start
+
+    report = summarize(results)
+    report['config'] = {'policy': args.policy, 'seed': args.seed, 'max_seconds': args.max_seconds, 'backend': args.backend}
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.csv_path:
+        write_csv(args.csv_path, results)
+
+    print(json.dumps({k: report[k] for k in ('episodes', 'deaths', 'score', 'survival_s', 'deaths_by_level')}, indent=2))
+    print(f"{args.episodes} episodes in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
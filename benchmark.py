@@ -0,0 +1,519 @@
+import os
+import sys
+import time
+
+PROCESS_START = time.perf_counter()
+
+# Benchmarks run without a window or sound card
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import json
+import random
+import statistics
+import subprocess
+
+import pygame
+
+from pool import release_all
+
+# Performance benchmarks for the gameplay hot paths.
+#
+#   python benchmark.py                     run everything and compare with the baseline
+#   python benchmark.py --suite frame       only the update+draw frame
+#   python benchmark.py --save-baseline     store the current numbers as the new baseline
+#
+# Every scenario reports median/p95/p99 in milliseconds (idle_cpu_percent in percent). When a baseline file exists
+# each number is compared against it and anything slower than --tolerance is flagged.
+
+BASELINE_PATH = 'benchmark_baseline.json'
+ENTITY_COUNTS = (10, 50, 100, 200, 400)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def frame_stats(samples_ms):
+    return {
+        'median': round(statistics.median(samples_ms), 4),
+        'p95': round(percentile(samples_ms, 95), 4),
+        'p99': round(percentile(samples_ms, 99), 4),
+        'mean': round(statistics.fmean(samples_ms), 4),
+        'samples': len(samples_ms),
+    }
+
+
+def setup_display():
+    pygame.init()
+    return pygame.display.get_surface() or pygame.display.set_mode((800, 500))
+
+
+def make_engine(seed=1, backend='sprites'):
+    from gameplay import GameView
+    from engine import GameEngine
+    view = GameView(setup_display())
+    engine = GameEngine(sizes=view.engine_sizes(), backend=backend)
+    engine.reset(seed)
+    return engine, view
+
+
+# Collisions are part of what is measured, so undo their effect instead of avoiding them
+def keep_alive(engine):
+    engine.player.lives = 3
+    engine.game_over = False
+
+
+# Top every group up to the requested size so frame cost stays comparable over a run.
+# spread > 1 widens the spawn band to the right by that factor (past the window edge),
+# so more entities can be placed at the same density.
+def populate(engine, rng, birds=0, clouds=0, bullets=0, hearts=0, spread=1):
+    from engine import BIRD_COLORS
+
+    def x(left):
+        return rng.randint(left, left + round((engine.width - left) * spread))
+    while engine.count('bird') < birds:
+        color = rng.choice(BIRD_COLORS)
+        engine.add_bird(x(300), engine.random_y(), color, engine.bird_speed)
+    while engine.count('cloud') < clouds:
+        engine.add_cloud(x(300), engine.random_y(), 1)
+    while engine.count('bullet') < bullets:
+        engine.add_bullet(x(100), engine.random_y())
+    while engine.count('heart') < hearts:
+        engine.add_heart(x(300), engine.random_y())
+
+
+# Animation cache lookups since its last reset_stats(); every miss is a GIF decode
+def animation_stats(cache):
+    stats = cache.stats()
+    return {'animation_hits': stats['hits'], 'animation_decodes': stats['misses']}
+
+
+def counts_for(n):
+    return {'birds': n, 'clouds': max(1, n // 4), 'bullets': max(1, n // 2), 'hearts': max(1, n // 10)}
+
+
+# (a) full update + draw + present at increasing entity counts, with the draw time of
+# each render layer and the animation frames decoded while playing (should be none)
+def bench_frame(frames=300, entity_counts=ENTITY_COUNTS):
+    from engine import ACTION_SHOOT
+    from sprite_cache import global_animation_cache
+    results = {}
+    for n in entity_counts:
+        engine, view = make_engine()
+        global_animation_cache.reset_stats()
+        rng = random.Random(n)
+        samples = []
+        for _ in range(frames):
+            populate(engine, rng, **counts_for(n))
+            start = time.perf_counter()
+            view.tick(engine, engine.step(ACTION_SHOOT))
+            pygame.display.update(view.draw(engine, 0.5))
+            samples.append((time.perf_counter() - start) * 1000)
+            keep_alive(engine)
+        stats = frame_stats(samples)
+        # where the draw time goes, and how much of the window is pushed per frame
+        renderer = view.renderer.stats()
+        stats.update({f'{name}_ms': round(ms, 4) for name, ms in renderer['layer_ms'].items()})
+        stats['pixels_per_frame'] = round(renderer['pixels_per_frame'])
+        stats.update(animation_stats(global_animation_cache))
+        results[f'frame/{n}'] = stats
+    return results
+
+
+# (b) one simulation tick that fires a bullet, including the effect/sound handling;
+# also reports how the sound manager's voice limits treated the burst, and checks that
+# no bullet animation is decoded while firing
+def bench_bullets(spawns=2000):
+    from engine import ACTION_SHOOT
+    from config import global_sound_manager
+    from sprite_cache import global_animation_cache
+    engine, view = make_engine()
+    global_sound_manager.reset_stats()
+    global_animation_cache.reset_stats()
+    samples = []
+    for i in range(spawns):
+        engine.last_bullet_time = float('-inf')
+        start = time.perf_counter()
+        view.tick(engine, engine.step(ACTION_SHOOT))
+        samples.append((time.perf_counter() - start) * 1000)
+        keep_alive(engine)
+        if i % 100 == 99:
+            release_all(engine.bullet_group)
+    stats = frame_stats(samples)
+    stats.update(global_sound_manager.stats()['totals'])
+    stats.update(animation_stats(global_animation_cache))
+    assert stats['animation_decodes'] == 0, 'bullet animation frames were decoded during play'
+    return {'bullet_spawn': stats}
+
+
+# (c) the collision passes on their own, including building the broad-phase grids
+def bench_collisions(passes=300, entity_counts=ENTITY_COUNTS):
+    results = {}
+    for n in entity_counts:
+        engine, _ = make_engine()
+        rng = random.Random(n)
+        samples = []
+        for _ in range(passes):
+            populate(engine, rng, **counts_for(n))
+            events = []
+            start = time.perf_counter()
+            engine.bird_grid.build(engine.bird_group)
+            engine.cloud_grid.build(engine.cloud_group)
+            engine.heart_grid.build(engine.heart_pickup_group)
+            engine.collide_player_birds(events)
+            engine.collide_bullets_birds(engine.bullet_group.sprites(), events)
+            engine.collide_player_pickups(events)
+            samples.append((time.perf_counter() - start) * 1000)
+            keep_alive(engine)
+        results[f'collisions/{n}'] = frame_stats(samples)
+    return results
+
+
+# Stress test for the broad phase: bullets x birds through the grid against the
+# linear spritecollide scan it replaced. The spawn band grows with n so the density,
+# and so each cell's occupancy, is the same at every count (asserted below); the
+# numbers then show how the broad phase scales rather than how crowded the screen is.
+# Reported per count: mean birds per occupied cell, the grid's speedup over the linear
+# scan, and the growth of the grid's per-entity cost since the smallest count. At fixed
+# density the linear scan's per-entity cost grows with n while the grid's only creeps
+# up (interpreter/cache overhead of a larger working set); at the smallest counts the
+# linear scan can still be as fast as or faster than the grid.
+def bench_broad_phase(passes=100, entity_counts=(100, 200, 400, 800, 1600)):
+    from spatial_hash import SpatialHash
+    results = {}
+    for n in entity_counts:
+        engine, _ = make_engine()
+        rng = random.Random(n)
+        populate(engine, rng, birds=n, bullets=n // 2, spread=n / entity_counts[0])
+        bullets, birds = engine.bullet_group.sprites(), engine.bird_group
+        grid = SpatialHash().build(birds)
+        occupancy = sum(len(bucket) for bucket in grid.cells.values()) / len(grid.cells)
+        grid_samples, linear_samples = [], []
+        for _ in range(passes):
+            start = time.perf_counter()
+            grid.build(birds)
+            grid_hits = sum(len(grid.colliding(bullet)) for bullet in bullets)
+            grid_samples.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            linear_hits = sum(len(pygame.sprite.spritecollide(bullet, birds, False)) for bullet in bullets)
+            linear_samples.append((time.perf_counter() - start) * 1000)
+            assert grid_hits == linear_hits
+        grid_stats = frame_stats(grid_samples)
+        linear_stats = frame_stats(linear_samples)
+        per_entity = frame_stats([ms * 1000 / (n + n // 2) for ms in grid_samples])
+        grid_stats['cell_occupancy'] = round(occupancy, 2)
+        grid_stats['speedup_vs_linear'] = round(linear_stats['median'] / grid_stats['median'], 2)
+        results[f'broadphase/grid/{n}'] = grid_stats
+        results[f'broadphase/linear/{n}'] = linear_stats
+        results[f'broadphase/grid_per_entity_us/{n}'] = per_entity
+
+    occupancies = [results[f'broadphase/grid/{n}']['cell_occupancy'] for n in entity_counts]
+    assert max(occupancies) < 1.5 * min(occupancies), f'cell occupancy is not constant: {occupancies}'
+    for n in entity_counts:
+        per_entity = results[f'broadphase/grid_per_entity_us/{n}']
+        per_entity['growth'] = round(per_entity['median'] / results[f'broadphase/grid_per_entity_us/{entity_counts[0]}']['median'], 2)
+    return results
+
+
+# Moving, animating, culling and player-testing every bullet, bird, cloud and heart for
+# one tick: the pygame sprites (update() per object, grid collisions) against the NumPy
+# entity arrays. Both get the same spawns and must end every tick with the same entities.
+def bench_entities(ticks=60, entity_counts=(100, 1000, 10000)):
+    try:
+        from entity_store import EntityWorld
+    except ImportError as e:
+        print(f"Skipping entity benchmark: {e}")
+        return {}
+    from engine import BIRD_COLORS
+    results = {}
+    for n in entity_counts:
+        engine, _ = make_engine()
+        world = EntityWorld(engine.width, engine.height)
+        rng = random.Random(n)
+        sizes, player = engine.sizes, engine.player
+        counts = counts_for(n)
+        kinds = (
+            ('bullets', engine.bullet_group, world.bullets, lambda x, y: engine.bullet_pool.acquire(x, y, sizes['bullet'])),
+            ('birds', engine.bird_group, world.birds, None),
+            ('clouds', engine.cloud_group, world.clouds, lambda x, y: engine.cloud_pool.acquire(x, y, 1, sizes['cloud'])),
+            ('hearts', engine.heart_pickup_group, world.hearts, lambda x, y: engine.heart_pool.acquire(x, y, sizes['heart'])),
+        )
+        grids = ((engine.bird_group, engine.bird_grid), (engine.cloud_group, engine.cloud_grid), (engine.heart_pickup_group, engine.heart_grid))
+        sprite_samples, array_samples = [], []
+        for _ in range(ticks):
+            for name, group, arrays, acquire in kinds:
+                while len(group) < counts[name]:
+                    x, y = rng.randint(300, engine.width), engine.random_y()
+                    if name == 'birds':
+                        color = rng.choice(BIRD_COLORS)
+                        group.add(engine.bird_pool.acquire(x, y, color, engine.bird_speed, sizes['bird'][color]))
+                        arrays.spawn(x, y, sizes['bird'][color], engine.bird_speed, BIRD_COLORS.index(color))
+                    else:
+                        group.add(acquire(x, y))
+                        arrays.spawn(x, y, group.sprites()[-1].rect.size)
+
+            start = time.perf_counter()
+            for bullet in engine.bullet_group.sprites():
+                bullet.update(engine.width)
+            engine.bird_group.update()
+            engine.cloud_group.update()
+            engine.heart_pickup_group.update()
+            sprite_hits = 0
+            for group, grid in grids:
+                grid.build(group)
+                for sprite in grid.colliding(player):
+                    sprite.kill()
+                    sprite_hits += 1
+            sprite_samples.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            world.step()
+            array_hits = sum(len(hits) for hits in world.collide_player(player.rect).values())
+            array_samples.append((time.perf_counter() - start) * 1000)
+
+            assert sprite_hits == array_hits
+            for name, group, arrays, _ in kinds:
+                assert [sprite.rect.x for sprite in group] == arrays.field('x').astype(int).tolist(), name
+        results[f'entities/sprites/{n}'] = frame_stats(sprite_samples)
+        results[f'entities/numpy/{n}'] = frame_stats(array_samples)
+    return results
+
+
+# The same full tick and draw as bench_frame on each engine backend, at entity counts
+# where per-object update() cost dominates
+def bench_backends(frames=200, entity_counts=(100, 1000, 5000)):
+    try:
+        import entity_store  # noqa: F401
+    except ImportError as e:
+        print(f"Skipping backend benchmark: {e}")
+        return {}
+    from engine import ACTION_SHOOT
+    results = {}
+    for backend in ('sprites', 'numpy'):
+        for n in entity_counts:
+            engine, view = make_engine(backend=backend)
+            rng = random.Random(n)
+            tick_samples, draw_samples = [], []
+            for _ in range(frames):
+                populate(engine, rng, **counts_for(n))
+                start = time.perf_counter()
+                view.tick(engine, engine.step(ACTION_SHOOT))
+                ticked = time.perf_counter()
+                pygame.display.update(view.draw(engine, 0.5))
+                tick_samples.append((ticked - start) * 1000)
+                draw_samples.append((time.perf_counter() - ticked) * 1000)
+                keep_alive(engine)
+            results[f'backends/{backend}/tick/{n}'] = frame_stats(tick_samples)
+            results[f'backends/{backend}/draw/{n}'] = frame_stats(draw_samples)
+    return results
+
+
+# Long session with and without sprite pooling: allocations and GC collections
+def bench_pooling(ticks=20000):
+    import gc
+    from engine import GameEngine, ACTION_SHOOT, ACTION_UP, ACTION_DOWN
+    results = {}
+    for name, caps in (('on', None), ('off', {'bullet': 0, 'bird': 0, 'cloud': 0, 'heart': 0})):
+        _, view = make_engine()
+        engine = GameEngine(sizes=view.engine_sizes(), pool_caps=caps)
+        engine.reset(7)
+        if caps is not None:
+            view.explosion_pool.cap = view.pick_up_effect_pool.cap = 0
+            view.explosion_pool.free.clear()
+            view.pick_up_effect_pool.free.clear()
+        rng = random.Random(7)
+        samples = []
+        collections_before = sum(stat['collections'] for stat in gc.get_stats())
+        for _ in range(ticks):
+            actions = ACTION_SHOOT | rng.choice((0, ACTION_UP, ACTION_DOWN))
+            start = time.perf_counter()
+            view.tick(engine, engine.step(actions))
+            samples.append((time.perf_counter() - start) * 1000)
+            keep_alive(engine)
+        stats = frame_stats(samples)
+        pools = dict(engine.pool_stats(), **view.pool_stats())
+        stats['allocations'] = sum(pool['created'] for pool in pools.values())
+        stats['reuses'] = sum(pool['reused'] for pool in pools.values())
+        stats['gc_collections'] = sum(stat['collections'] for stat in gc.get_stats()) - collections_before
+        results[f'pooling/{name}'] = stats
+    return results
+
+
+# Runs one static screen for a few seconds in a fresh interpreter and reports how much
+# CPU time it used; the screen is closed with a timed QUIT event.
+def idle_probe(screen_name, seconds=2.0):
+    screen = setup_display()
+    from main import register_scenes
+    from scenes import SceneManager
+    manager = register_scenes(SceneManager(screen))
+    kwargs = {'latest_score': 12, 'highest_score': 34} if screen_name == 'game_over' else {}
+
+    pygame.time.set_timer(pygame.QUIT, int(seconds * 1000), 1)
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    manager.run(screen_name, **kwargs)
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    print(json.dumps({'cpu_percent': cpu / wall * 100, 'wall_s': wall}))
+
+
+# (e) CPU use while sitting on a static screen
+def bench_idle(runs=3, screens=('menu', 'settings', 'game_over')):
+    results = {}
+    for screen_name in screens:
+        samples = []
+        for _ in range(runs):
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), '--idle-probe', screen_name],
+                                    capture_output=True, text=True, check=True).stdout
+            samples.append(json.loads(output.strip().splitlines()[-1])['cpu_percent'])
+        results[f'idle_cpu_percent/{screen_name}'] = frame_stats(samples)
+    return results
+
+
+class _FirstFrame(Exception):
+    pass
+
+
+# Runs in a fresh interpreter: clicks "Start Game", skips the tutorial with a key press
+# and stops at the first presented gameplay frame.
+def startup_probe():
+    phases = {}
+    import main
+    phases['imports'] = (time.perf_counter() - PROCESS_START) * 1000
+    import gameplay
+
+    enter_tutorial = gameplay.TutorialScene.enter
+
+    def tutorial_with_keypress(scene, **kwargs):
+        phases['menu_to_tutorial'] = (time.perf_counter() - main_start) * 1000
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE, mod=0, unicode=' ', scancode=0))
+        enter_tutorial(scene, **kwargs)
+
+    def first_frame():
+        raise _FirstFrame()
+
+    import scenes
+    present = scenes.present
+
+    def present_and_record(dirty_rects):
+        present(dirty_rects)
+        phases.setdefault('menu_interactive', (time.perf_counter() - PROCESS_START) * 1000)
+
+    gameplay.TutorialScene.enter = tutorial_with_keypress
+    scenes.present = present_and_record
+    gameplay.frame_hook = first_frame
+    pygame.init()
+    pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(400, 210), button=1))
+    main_start = time.perf_counter()
+    try:
+        main.main()
+    except _FirstFrame:
+        pass
+    phases['main_to_first_frame'] = (time.perf_counter() - main_start) * 1000
+    phases['total'] = (time.perf_counter() - PROCESS_START) * 1000
+    print(json.dumps(phases))
+
+
+# (d) process start to first gameplay frame, each run in a new interpreter
+def bench_startup(runs=5):
+    totals, main_to_frame, imports, interactive = [], [], [], []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--startup-probe'],
+                                capture_output=True, text=True, check=True).stdout
+        phases = json.loads(output.strip().splitlines()[-1])
+        totals.append(phases['total'])
+        main_to_frame.append(phases['main_to_first_frame'])
+        imports.append(phases['imports'])
+        interactive.append(phases['menu_interactive'])
+    return {
+        'startup/total': frame_stats(totals),
+        'startup/imports': frame_stats(imports),
+        'startup/menu_interactive': frame_stats(interactive),
+        'startup/main_to_first_frame': frame_stats(main_to_frame),
+    }
+
+
+SUITES = {
+    'frame': bench_frame,
+    'bullets': bench_bullets,
+    'collisions': bench_collisions,
+    'entities': bench_entities,
+    'backends': bench_backends,
+    'broadphase': bench_broad_phase,
+    'pooling': bench_pooling,
+    'idle': bench_idle,
+    'startup': bench_startup,
+}
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for key in ('median', 'p95', 'p99'):
+            if base.get(key) and stats[key] > base[key] * (1 + tolerance):
+                regressions.append((name, key, base[key], stats[key]))
+    return regressions
+
+
+def print_report(results, baseline):
+    print(f"{'scenario':32} {'median':>9} {'p95':>9} {'p99':>9}  vs baseline (median)")
+    for name, stats in results.items():
+        base = baseline.get(name)
+        change = f"{(stats['median'] / base['median'] - 1) * 100:+.1f}%" if base and base.get('median') else '-'
+        extras = ' '.join(f'{key}={value}' for key, value in stats.items() if key not in ('median', 'p95', 'p99', 'mean', 'samples'))
+        print(f"{name:32} {stats['median']:9.3f} {stats['p95']:9.3f} {stats['p99']:9.3f}  {change}  {extras}".rstrip())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the gameplay hot paths with the SDL dummy drivers.')
+    parser.add_argument('--suite', choices=['all'] + sorted(SUITES), action='append', help='may be repeated (default: all)')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='write these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='allowed slowdown before flagging a regression')
+    parser.add_argument('--json', dest='json_path', help='also write the results here')
+    parser.add_argument('--startup-probe', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--idle-probe', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.startup_probe:
+        startup_probe()
+        return 0
+    if args.idle_probe:
+        idle_probe(args.idle_probe)
+        return 0
+
+    suites = [s for s in args.suite or [] if s != 'all'] or sorted(SUITES)
+    results = {}
+    for suite in suites:
+        results.update(SUITES[suite]())
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for name, key, before, after in regressions:
+        print(f"REGRESSION {name} {key}: {before:.3f}ms -> {after:.3f}ms")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
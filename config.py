@@ -1,55 +1,260 @@
+import os
 import pygame
-pygame.init()
-pygame.mixer.init()
+from sound_cache import global_pcm_cache
 
+
+# Set when the mixer could not be started; it is not retried after that
+audio_unavailable = False
+
+
+# The mixer is started on first use instead of at import time
+def init_audio():
+    global audio_unavailable
+    if audio_unavailable:
+        return False
+    if not pygame.mixer.get_init():
+        try:
+            pygame.mixer.init()
+        except pygame.error as e:
+            print("Could not initialise audio:", e)
+            audio_unavailable = True
+        else:
+            for path in missing_audio_paths():
+                print(f"Missing audio file {path}; it will not be played")
+    return pygame.mixer.get_init() is not None
+
+
+# True only if the file exists with exactly this name, so a path whose case is wrong
+# fails here too and not just on case-sensitive filesystems
+def path_exists(path):
+    directory, name = os.path.split(path)
+    try:
+        return name in os.listdir(directory or '.')
+    except OSError:
+        return False
+
+
+# Every configured sound and music file that is not on disk
+def missing_audio_paths():
+    paths = list(SoundManager.sound_paths.values()) + list(MusicPlayer.track_paths.values())
+    return [path for path in paths if not path_exists(path)]
+
+# Sounds are decoded on first use, or ahead of time by the asset preloader.
+# Voices are managed here instead of by pygame: the first channels are reserved for the
+# looping engine sound and for one-off stingers, so effects can never take them. Every
+# other sound has a priority, a max number of voices and a cooldown; when all effect
+# channels are busy a new sound steals the oldest voice of equal or lower priority,
+# otherwise it is dropped. stats() reports how often each of those happened.
 class SoundManager:
-    def __init__(self):
+    sound_paths = {
+        'bullet': 'sound effect/bullet.mp3',
+        'game_start': 'sound effect/helikopter game start.MP3',
+        'helicopter_continuous': 'sound effect/helikopter continuos.MP3',
+        'collision': 'sound effect/plane clash.MP3',
+        'hit_bird': 'sound effect/hit bird.MP3',
+        'game_over': 'sound effect/explosion.mp3',
+        'pickup_heart': 'sound effect/heartpickup.mp3'
+    }
+
+    # name: (priority, max voices, cooldown ms)
+    sound_limits = {
+        'bullet': (1, 3, 60),
+        'hit_bird': (2, 4, 30),
+        'collision': (3, 2, 100),
+        'pickup_heart': (3, 1, 0),
+    }
+    default_limits = (2, 2, 0)
+
+    LOOP_CHANNEL = 0
+    STINGER_CHANNEL = 1
+    MUSIC_CHANNEL = 2
+    stingers = ('game_start', 'game_over')
+
+    def __init__(self, num_channels=12, reserved_channels=3):
         self.sounds = {}
         self.continuous_sound = None
-        self.load_sounds()
+        self.num_channels = num_channels
+        self.reserved_channels = reserved_channels
+        self.voices = {}
+        self.last_played = {}
+        self.counters = {}
 
     def load_sounds(self):
-        sound_paths = {
-            'bullet': 'sound effect/bullet.mp3',
-            'game_start': 'sound effect/helikopter game start.MP3',
-            'helicopter_continuous': 'sound effect/helikopter continuos.MP3',
-            'collision': 'sound effect/plane clash.MP3',
-            'hit_bird': 'sound effect/hit bird.mp3',
-            'game_over': 'sound effect/explosion.mp3',
-            'pickup_heart': 'sound effect/heartpickup.mp3'
-        }
-
-        for name, path in sound_paths.items():
-            try:
-                self.sounds[name] = pygame.mixer.Sound(path)
-                volume = 1.0 if name == 'pickup_heart' else 0.7
-                self.sounds[name].set_volume(volume)
-            except Exception as e:
-                print(f"Failed to load sound {path}: {str(e)}")
-                self.sounds[name] = None
+        for name in self.sound_paths:
+            self.store(name, self.decode(name))
+
+    # Decoding only; safe to call from a worker thread once init_audio() has run
+    def decode(self, name):
+        path = self.sound_paths[name]
+        try:
+            return global_pcm_cache.load(path)
+        except Exception as e:
+            print(f"Failed to load sound {path}: {str(e)}")
+            return None
+
+    def store(self, name, sound):
+        if sound:
+            volume = 1.0 if name == 'pickup_heart' else 0.7
+            sound.set_volume(volume)
+        self.sounds[name] = sound
+
+    def sound(self, name):
+        if name not in self.sounds and name in self.sound_paths and init_audio():
+            self.store(name, self.decode(name))
+        return self.sounds.get(name)
+
+    def setup_channels(self):
+        if pygame.mixer.get_num_channels() != self.num_channels:
+            pygame.mixer.set_num_channels(self.num_channels)
+            pygame.mixer.set_reserved(self.reserved_channels)
+            self.voices.clear()
+
+    def _count(self, name, what):
+        counters = self.counters.setdefault(name, {'played': 0, 'cooldown': 0, 'limit': 0, 'dropped': 0, 'stolen': 0})
+        counters[what] += 1
 
     def play(self, name, loop=False):
-        if not sound_enabled or name not in self.sounds or not self.sounds[name]:
+        if not sound_enabled:
+            return
+        sound = self.sound(name)
+        if not sound:
             return
+        self.setup_channels()
         if loop:
             if self.continuous_sound:
                 self.continuous_sound.stop()
-            self.sounds[name].play(-1)
-            self.continuous_sound = self.sounds[name]
+            pygame.mixer.Channel(self.LOOP_CHANNEL).play(sound, -1)
+            self.continuous_sound = sound
+        elif name in self.stingers:
+            pygame.mixer.Channel(self.STINGER_CHANNEL).play(sound)
         else:
-            self.sounds[name].play()
+            self._play_effect(name, sound)
+            return
+        self._count(name, 'played')
+
+    def _play_effect(self, name, sound):
+        priority, max_voices, cooldown = self.sound_limits.get(name, self.default_limits)
+        now = pygame.time.get_ticks()
+        if now - self.last_played.get(name, -cooldown) < cooldown:
+            self._count(name, 'cooldown')
+            return
+
+        # forget voices that have finished
+        for index in [index for index in self.voices if not pygame.mixer.Channel(index).get_busy()]:
+            del self.voices[index]
+
+        own = [index for index, voice in self.voices.items() if voice[0] == name]
+        if len(own) >= max_voices:
+            self._count(name, 'limit')
+            return
+
+        index = next((i for i in range(self.reserved_channels, self.num_channels) if i not in self.voices), None)
+        if index is None:
+            # oldest voice among the lowest-priority ones that are not above this sound
+            candidates = [(voice[1], voice[2], i) for i, voice in self.voices.items() if voice[1] <= priority]
+            if not candidates:
+                self._count(name, 'dropped')
+                return
+            index = min(candidates)[2]
+            self._count(self.voices[index][0], 'stolen')
+
+        pygame.mixer.Channel(index).play(sound)
+        self.voices[index] = (name, priority, now)
+        self.last_played[name] = now
+        self._count(name, 'played')
 
     def stop_all(self):
         if self.continuous_sound:
             self.continuous_sound.stop()
             self.continuous_sound = None
 
+    def stats(self):
+        totals = {'played': 0, 'cooldown': 0, 'limit': 0, 'dropped': 0, 'stolen': 0}
+        for counters in self.counters.values():
+            for key, value in counters.items():
+                totals[key] += value
+        return {'totals': totals, 'sounds': {name: dict(counters) for name, counters in self.counters.items()}}
+
+    def reset_stats(self):
+        self.counters.clear()
+
+# Music played as whole decoded tracks on the sound manager's reserved music channel
+# instead of through pygame.mixer.music, so each track is decoded (or read from the PCM
+# cache) once and switching between gameplay and game-over music is a channel swap.
+# get_busy() follows pygame.mixer.music: a paused track does not count as busy.
+class MusicPlayer:
+    track_paths = {
+        'background': 'audio/background_music2.mp3',
+        'game_over': 'audio/game_over.mp3',
+    }
+
+    def __init__(self, sound_manager):
+        self.sound_manager = sound_manager
+        self.tracks = {}
+        self.current = None
+        self.paused = False
+        self.volume = 1.0
+
+    def track(self, name):
+        if name not in self.tracks:
+            try:
+                self.tracks[name] = global_pcm_cache.load(self.track_paths[name])
+            except (pygame.error, FileNotFoundError) as e:
+                print(f"Error loading {name} music:", e)
+                self.tracks[name] = None
+        return self.tracks[name]
+
+    def channel(self):
+        self.sound_manager.setup_channels()
+        return pygame.mixer.Channel(self.sound_manager.MUSIC_CHANNEL)
+
+    def set_volume(self, volume):
+        self.volume = volume
+        if self.current is not None:
+            self.channel().set_volume(volume)
+
+    def play(self, name, fade_ms=0):
+        if not init_audio():
+            return False
+        sound = self.track(name)
+        if sound is None:
+            return False
+        channel = self.channel()
+        channel.play(sound, loops=-1, fade_ms=fade_ms)
+        channel.set_volume(self.volume)
+        self.current = name
+        self.paused = False
+        return True
+
+    def pause(self):
+        if self.current is not None:
+            self.channel().pause()
+            self.paused = True
+
+    def unpause(self):
+        if self.current is not None:
+            self.channel().unpause()
+            self.paused = False
+
+    def stop(self):
+        if self.current is not None:
+            self.channel().stop()
+            self.current = None
+            self.paused = False
+
+    def get_busy(self):
+        return self.current is not None and not self.paused and self.channel().get_busy()
+
+
 # Shared flag variables
 sound_enabled = True
 audio_enabled = True
 music_is_paused = False
 background_music_loaded = False
+record_path = None  # set by main.py --record; every game played is recorded there
+engine_backend = 'sprites'  # set by main.py --backend; see engine.BACKENDS
 
 
-# Shared sound manager
+# Shared sound manager and music player
 global_sound_manager = SoundManager()
+global_music = MusicPlayer(global_sound_manager)
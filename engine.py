@@ -0,0 +1,554 @@
+import heapq
+import math
+import random
+from collections import namedtuple
+import pygame
+
+from timestep import remember_positions
+from spatial_hash import SpatialHash, mask_narrow_phase
+from pool import PooledSprite, SpritePool, release_all
+from waves import load_waves
+
+# Headless game simulation. Everything that decides how the game plays lives here:
+# player/bullet/bird/cloud/heart movement, spawn timers, collisions, score and
+# difficulty. It runs on a simulated tick clock and never touches the display,
+# so it can be driven from gameplay.py, tests, batch runs or agents alike.
+# Difficulty levels and spawn settings come from the wave table in waves.json.
+#
+# Bullets, birds, clouds and hearts live in one of two backends: 'sprites' (pooled
+# pygame sprites, grid broad phase, optional pixel-perfect hits) or 'numpy' (the entity
+# arrays of entity_store.py, bounding-box hits only). Both play the same game: same
+# spawns, same order of moves and hits, same score and lives.
+
+GAME_WIDTH, GAME_HEIGHT = 800, 500
+PADDING_Y = 50
+TICK_RATE = 120
+BULLET_COOLDOWN = 500
+BIRD_COLORS = ['blue', 'grey', 'red', 'yellow']
+PLAYER_FRAMES = 2
+PLAYER_ANGLES = (-15, 0, 15)
+
+# Input bits for step()
+ACTION_UP = 1
+ACTION_DOWN = 2
+ACTION_SHOOT = 4
+
+# Sizes of the scaled images gameplay.py draws, so headless runs collide the same way
+DEFAULT_SIZES = {
+    'player': (70, 47),
+    'bullet': (20, 20),
+    'bird': {'blue': (50, 35), 'grey': (50, 35), 'red': (50, 34), 'yellow': (50, 34)},
+    'cloud': (100, 59),
+    'heart': (30, 26),
+}
+
+# Layout version of GameEngine.snapshot()
+STATE_VERSION = 2
+
+# Spawns due on the same tick happen in this order, so they draw from the RNG in a fixed order
+SPAWN_ORDER = {'bird': 0, 'heart': 1, 'cloud': 2}
+
+# kind: 'bullet', 'hit_bird', 'collision' (detail = 'bird' or 'cloud'), 'pickup_heart',
+# 'level_up' (detail = new difficulty level) or 'game_over'
+Event = namedtuple('Event', 'kind x y detail')
+
+
+# Bounding box pygame.transform.rotate produces for a surface of this size
+def rotated_size(size, angle):
+    if angle % 360 == 0:
+        return tuple(size)
+    rad = math.radians(angle)
+    cos, sin = math.cos(rad), math.sin(rad)
+    half_w, half_h = size[0] / 2, size[1] / 2
+    new_w = max(abs(half_w * cos - half_h * sin), abs(half_w * cos + half_h * sin))
+    new_h = max(abs(half_w * sin - half_h * cos), abs(half_w * sin + half_h * cos))
+    return (int(new_w * 2), int(new_h * 2))
+
+
+# json turns tuples into lists
+def position(pos):
+    return tuple(pos) if pos is not None else None
+
+
+class Player(pygame.sprite.Sprite):
+    def __init__(self, x, y, sizes):
+        super().__init__()
+        self.x, self.y, self.lives, self.score, self.image_index, self.image_angle = x, y, 3, 0, 0, 0
+        self.sizes = sizes
+        self.rect = pygame.Rect((self.x, self.y), self.sizes[0])
+        self.prev_pos = None
+
+    def update(self):
+        self.image_index = (self.image_index + 1) % PLAYER_FRAMES
+        self.rect = pygame.Rect((self.x, self.y), self.sizes[self.image_angle])
+
+
+# Short-lived entities are pooled: __init__ only allocates, reset() sets the state,
+# so a released sprite can be re-initialised in place by its pool.
+class Bullet(PooledSprite):
+    def __init__(self, x, y, size):
+        super().__init__()
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.reset(x, y, size)
+
+    def reset(self, x, y, size):
+        self.frame_index = 0
+        self.rect.update((x, y), size)
+        self.prev_pos = None
+
+    def update(self, width):
+        self.rect.x += 4
+        self.frame_index += 0.2
+        if self.rect.x > width:
+            self.kill()
+
+
+class Bird(PooledSprite):
+    def __init__(self, x, y, color, speed, size):
+        super().__init__()
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.reset(x, y, color, speed, size)
+
+    def reset(self, x, y, color, speed, size):
+        self.x, self.y, self.color, self.image_index, self.speed = x, y, color, 0, speed
+        self.rect.update((self.x, self.y), size)
+        self.prev_pos = None
+
+    def update(self):
+        self.x -= 2
+        self.rect.x -= self.speed
+        self.image_index = (self.image_index + 0.25) % 4
+        if self.x < 0:
+            self.kill()
+
+
+class Cloud(PooledSprite):
+    def __init__(self, x, y, speed, size):
+        super().__init__()
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.reset(x, y, speed, size)
+
+    def reset(self, x, y, speed, size):
+        self.x, self.y, self.speed = x, y, speed
+        self.rect.update((self.x, self.y), size)
+        self.prev_pos = None
+
+    def update(self):
+        self.x -= self.speed
+        self.rect.x = self.x
+        if self.x < -self.rect.width:
+            self.kill()
+
+
+class HeartPickup(PooledSprite):
+    def __init__(self, x, y, size):
+        super().__init__()
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.reset(x, y, size)
+
+    def reset(self, x, y, size):
+        self.x, self.y, self.speed = x, y, 2
+        self.rect.update((self.x, self.y), size)
+        self.prev_pos = None
+
+    def update(self):
+        self.x -= self.speed
+        self.rect.x = self.x
+        if self.x < 0:
+            self.kill()
+
+
+DEFAULT_POOL_CAPS = {'bullet': 64, 'bird': 128, 'cloud': 32, 'heart': 8}
+# Sprites each pool allocates up front, a little above what a game keeps alive at once
+POOL_PREFILL = {'bullet': 4, 'bird': 8, 'cloud': 10, 'heart': 2}
+BACKENDS = ('sprites', 'numpy')
+
+
+class GameEngine:
+    def __init__(self, sizes=None, width=GAME_WIDTH, height=GAME_HEIGHT, tick_rate=TICK_RATE, mask_of=None, cell_size=64, pool_caps=None, waves=None, backend='sprites'):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown engine backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+        if backend == 'numpy' and mask_of:
+            raise ValueError("The numpy backend only collides bounding boxes; pixel-perfect collisions need the sprites backend")
+        sizes = dict(DEFAULT_SIZES, **(sizes or {}))
+        player_size = sizes['player']
+        self.player_sizes = sizes.get('player_rotated') or {
+            angle: rotated_size(player_size, angle) for angle in PLAYER_ANGLES
+        }
+        self.sizes = sizes
+        self.width, self.height = width, height
+        self.padding_y = PADDING_Y
+        self.tick_rate = tick_rate
+        self.step_ms = 1000 / tick_rate
+        self.waves = waves or load_waves()
+        self.spawn_log = None  # set to a list to collect (time, level, kind, count) for every spawn
+
+        self.player_group = pygame.sprite.Group()
+        self.bullet_group = pygame.sprite.Group()
+        self.bird_group = pygame.sprite.Group()
+        self.cloud_group = pygame.sprite.Group()
+        self.heart_pickup_group = pygame.sprite.Group()
+        self.kind_groups = {'bullet': self.bullet_group, 'bird': self.bird_group, 'cloud': self.cloud_group, 'heart': self.heart_pickup_group}
+
+        # The numpy backend keeps bullets, birds, clouds and hearts in arrays instead of
+        # the groups above, which then stay empty
+        self.backend = backend
+        self.entities = None
+        if backend == 'numpy':
+            from entity_store import EntityWorld
+            self.entities = EntityWorld(width, height)
+
+        # Broad phase grids, rebuilt once per tick; mask_of enables pixel-accurate hits
+        self.bird_grid = SpatialHash(cell_size)
+        self.cloud_grid = SpatialHash(cell_size)
+        self.heart_grid = SpatialHash(cell_size)
+        self.narrow_phase = mask_narrow_phase(mask_of) if mask_of else None
+
+        pool_caps = dict(DEFAULT_POOL_CAPS, **(pool_caps or {}))
+        self.bullet_pool = SpritePool(Bullet, pool_caps['bullet'])
+        self.bird_pool = SpritePool(Bird, pool_caps['bird'])
+        self.cloud_pool = SpritePool(Cloud, pool_caps['cloud'])
+        self.heart_pool = SpritePool(HeartPickup, pool_caps['heart'])
+        if self.entities is None:
+            self.bullet_pool.prefill(POOL_PREFILL['bullet'], 0, 0, sizes['bullet'])
+            self.bird_pool.prefill(POOL_PREFILL['bird'], 0, 0, BIRD_COLORS[0], 1, sizes['bird'][BIRD_COLORS[0]])
+            self.cloud_pool.prefill(POOL_PREFILL['cloud'], 0, 0, 1, sizes['cloud'])
+            self.heart_pool.prefill(POOL_PREFILL['heart'], 0, 0, sizes['heart'])
+
+        # The state every game starts from; reset() restores it and reseeds
+        self.rng = random.Random(0)
+        self.seed = 0
+        self.ticks = 0
+        self.game_over = False
+        self.bg_scroll = 0
+        self.player = Player(30, self.height // 2, self.player_sizes)
+        self.player_group.add(self.player)
+
+        self.set_level(0)
+
+        # Spawn timeline: a heap of (time, SPAWN_ORDER, kind); each tick only pops what is due.
+        # Due spawns that cannot happen yet (a heart at full lives, clouds at the cap)
+        # wait and are retried every tick.
+        self.timeline = []
+        self.waiting = []
+        self.last_bullet_time = 0
+        self.schedule('bird', 0)
+        self.schedule('heart', 0)
+        self.initial_state = self.snapshot()
+        self.reset()
+
+    @property
+    def time(self):
+        return self.ticks * self.step_ms
+
+    @property
+    def groups(self):
+        return (self.player_group, self.bullet_group, self.bird_group, self.cloud_group, self.heart_pickup_group)
+
+    def reset(self, seed=None):
+        self.restore(self.initial_state)
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng.seed(self.seed)
+        self.schedule('cloud', self.time + self.rng.randint(self.waves.clouds['first_delay'], self.cloud_spawn_interval))
+
+    # The whole game state as plain data: numbers, strings and tuples of them. Nothing in
+    # it is mutable, so a snapshot is cheap to keep around and safe to restore any number
+    # of times, and it survives a json round trip.
+    def snapshot(self):
+        player = self.player
+        if self.entities is not None:
+            entities = self.entities.snapshot(BIRD_COLORS)
+        else:
+            entities = {
+                'bullets': tuple((tuple(bullet.rect), bullet.frame_index, bullet.prev_pos) for bullet in self.bullet_group),
+                'birds': tuple((bird.x, bird.y, tuple(bird.rect), bird.color, bird.speed, bird.image_index, bird.prev_pos) for bird in self.bird_group),
+                'clouds': tuple((cloud.x, cloud.y, tuple(cloud.rect), cloud.speed, cloud.prev_pos) for cloud in self.cloud_group),
+                'hearts': tuple((heart.x, heart.y, tuple(heart.rect), heart.speed, heart.prev_pos) for heart in self.heart_pickup_group),
+            }
+        return dict({
+            'version': STATE_VERSION,
+            'seed': self.seed,
+            'rng': self.rng.getstate(),
+            'ticks': self.ticks,
+            'game_over': self.game_over,
+            'bg_scroll': self.bg_scroll,
+            'difficulty': (self.difficulty_level, self.bird_spawn_interval, self.bird_speed, self.max_clouds_allowed, self.cloud_spawn_interval, self.cloud_burst, self.next_level_score),
+            'last_bullet_time': self.last_bullet_time,
+            'timeline': tuple(sorted(self.timeline)),
+            'waiting': tuple(self.waiting),
+            'player': (player.x, player.y, player.lives, player.score, player.image_index, player.image_angle, tuple(player.rect), player.prev_pos),
+        }, **entities)
+
+    # Put the game back into a snapshot() state; entities come from the pools, or go into
+    # the arrays on the numpy backend
+    def restore(self, state):
+        if state['version'] != STATE_VERSION:
+            raise ValueError(f"Game state version {state['version']} is not {STATE_VERSION}")
+        version, internal, gauss = state['rng']
+        self.seed = state['seed']
+        self.rng.setstate((version, tuple(internal), gauss))
+        self.ticks = state['ticks']
+        self.game_over = state['game_over']
+        self.bg_scroll = state['bg_scroll']
+        self.difficulty_level, self.bird_spawn_interval, self.bird_speed, self.max_clouds_allowed, self.cloud_spawn_interval, cloud_burst, self.next_level_score = state['difficulty']
+        self.cloud_burst = tuple(cloud_burst)
+        self.last_bullet_time = state['last_bullet_time']
+        # a sorted list is already a heap
+        self.timeline = [tuple(event) for event in state['timeline']]
+        self.waiting = list(state['waiting'])
+
+        for group in self.groups:
+            release_all(group)
+        player = self.player
+        player.x, player.y, player.lives, player.score, player.image_index, player.image_angle, rect, prev_pos = state['player']
+        player.rect = pygame.Rect(rect)
+        player.prev_pos = position(prev_pos)
+        self.player_group.add(player)
+
+        if self.entities is not None:
+            self.entities.restore(state, BIRD_COLORS)
+            return
+        for rect, frame_index, prev_pos in state['bullets']:
+            bullet = self.bullet_pool.acquire(rect[0], rect[1], rect[2:])
+            bullet.frame_index, bullet.prev_pos = frame_index, position(prev_pos)
+            self.bullet_group.add(bullet)
+        for x, y, rect, color, speed, image_index, prev_pos in state['birds']:
+            bird = self.bird_pool.acquire(x, y, color, speed, rect[2:])
+            bird.rect.topleft = rect[:2]
+            bird.image_index, bird.prev_pos = image_index, position(prev_pos)
+            self.bird_group.add(bird)
+        for x, y, rect, speed, prev_pos in state['clouds']:
+            cloud = self.cloud_pool.acquire(x, y, speed, rect[2:])
+            cloud.rect.topleft = rect[:2]
+            cloud.prev_pos = position(prev_pos)
+            self.cloud_group.add(cloud)
+        for x, y, rect, speed, prev_pos in state['hearts']:
+            heart = self.heart_pool.acquire(x, y, rect[2:])
+            heart.rect.topleft = rect[:2]
+            heart.speed, heart.prev_pos = speed, position(prev_pos)
+            self.heart_pickup_group.add(heart)
+
+    def pool_stats(self):
+        return {
+            'bullet': self.bullet_pool.stats(),
+            'bird': self.bird_pool.stats(),
+            'cloud': self.cloud_pool.stats(),
+            'heart': self.heart_pool.stats(),
+        }
+
+    # Entities are added, counted and looked up through these so callers work with either backend
+    def add_bullet(self, x, y):
+        if self.entities is not None:
+            self.entities.bullets.spawn(x, y, self.sizes['bullet'])
+        else:
+            self.bullet_group.add(self.bullet_pool.acquire(x, y, self.sizes['bullet']))
+
+    def add_bird(self, x, y, color, speed):
+        size = self.sizes['bird'][color]
+        if self.entities is not None:
+            self.entities.birds.spawn(x, y, size, speed, BIRD_COLORS.index(color))
+        else:
+            self.bird_group.add(self.bird_pool.acquire(x, y, color, speed, size))
+
+    def add_cloud(self, x, y, speed):
+        if self.entities is not None:
+            self.entities.clouds.spawn(x, y, self.sizes['cloud'], speed)
+        else:
+            self.cloud_group.add(self.cloud_pool.acquire(x, y, speed, self.sizes['cloud']))
+
+    def add_heart(self, x, y):
+        if self.entities is not None:
+            self.entities.hearts.spawn(x, y, self.sizes['heart'])
+        else:
+            self.heart_pickup_group.add(self.heart_pool.acquire(x, y, self.sizes['heart']))
+
+    # kind: 'bullet', 'bird', 'cloud' or 'heart'
+    def count(self, kind):
+        if self.entities is not None:
+            return len(self.entities.kinds[kind])
+        return len(self.kind_groups[kind])
+
+    # pygame.Rects of every entity of a kind, in spawn order
+    def rects(self, kind):
+        if self.entities is not None:
+            return [pygame.Rect(row) for row in self.entities.kinds[kind].rows('x', 'y', 'w', 'h')]
+        return [sprite.rect for sprite in self.kind_groups[kind]]
+
+    def random_y(self):
+        return self.rng.randint(self.padding_y, self.height - self.padding_y * 2)
+
+    # Take the difficulty parameters of a level from the wave table
+    def set_level(self, number):
+        level = self.waves.level(number)
+        self.difficulty_level = number
+        self.bird_spawn_interval = level.bird_interval
+        self.bird_speed = level.bird_speed
+        self.max_clouds_allowed = level.max_clouds
+        self.cloud_spawn_interval = level.cloud_interval
+        self.cloud_burst = level.cloud_burst
+        self.next_level_score = self.waves.level(number + 1).score
+
+    def increase_difficulty(self):
+        self.set_level(self.difficulty_level + 1)
+
+    def cloud_speed(self):
+        clouds = self.waves.clouds
+        return max(clouds['min_speed'], self.bird_speed + clouds['speed_offset'])
+
+    def schedule(self, kind, due):
+        heapq.heappush(self.timeline, (due, SPAWN_ORDER[kind], kind))
+
+    def spawn_due(self, current_time):
+        timeline, waiting = self.timeline, self.waiting
+        while timeline and timeline[0][0] < current_time:
+            waiting.append(heapq.heappop(timeline)[2])
+        if waiting:
+            waiting.sort(key=SPAWN_ORDER.get)
+            self.waiting = [kind for kind in waiting if not self.spawn(kind, current_time)]
+
+    # Spawn one due event and schedule the next of its kind; False if it has to wait
+    def spawn(self, kind, current_time):
+        waves, rng = self.waves, self.rng
+        count = 1
+        if kind == 'bird':
+            y, color = self.random_y(), rng.choice(BIRD_COLORS)
+            self.add_bird(self.width, y, color, self.bird_speed)
+            self.schedule('bird', current_time + self.bird_spawn_interval + rng.randint(*waves.birds['interval_jitter']))
+        elif kind == 'heart':
+            if self.player.lives >= waves.hearts['max_lives']:
+                return False
+            self.add_heart(self.width, self.random_y())
+            self.schedule('heart', current_time + rng.randint(*waves.hearts['interval']))
+        else:
+            # Cloud bursts, up to the level's cap
+            room = self.max_clouds_allowed - self.count('cloud')
+            if room <= 0:
+                return False
+            count = min(rng.randint(*self.cloud_burst), room)
+            cloud_speed = self.cloud_speed()
+            for i in range(count):
+                offset_x = i * rng.randint(*waves.clouds['spacing'])
+                self.add_cloud(self.width + offset_x, self.random_y(), cloud_speed)
+            self.schedule('cloud', current_time + rng.randint(waves.clouds['min_interval'], self.cloud_spawn_interval))
+        if self.spawn_log is not None:
+            self.spawn_log.append((current_time, self.difficulty_level, kind, count))
+        return True
+
+    def step(self, actions=0):
+        if self.game_over:
+            return []
+        events = []
+        current_time = self.time
+        player = self.player
+        remember_positions(*self.groups)
+
+        if actions & ACTION_UP and player.rect.top > self.padding_y:
+            player.y -= 2
+            player.image_angle = 15
+        elif actions & ACTION_DOWN and player.rect.bottom < self.height - self.padding_y:
+            player.y += 2
+            player.image_angle = -15
+        else:
+            player.image_angle = 0
+
+        if actions & ACTION_SHOOT and self.last_bullet_time + BULLET_COOLDOWN < current_time:
+            player_w, player_h = self.sizes['player']
+            x, y = player.x + player_w, player.y + player_h // 2
+            self.add_bullet(x, y)
+            self.last_bullet_time = current_time
+            events.append(Event('bullet', x, y, None))
+
+        self.spawn_due(current_time)
+
+        # Level up once the score reaches the next level of the wave table
+        if player.score >= self.next_level_score:
+            self.increase_difficulty()
+            events.append(Event('level_up', None, None, self.difficulty_level))
+
+        # Update
+        player.update()
+        if self.entities is not None:
+            self.step_arrays(events)
+        else:
+            self.step_sprites(events)
+
+        self.bg_scroll += 1
+        self.ticks += 1
+
+        if player.lives <= 0:
+            self.game_over = True
+            events.append(Event('game_over', player.rect.centerx, player.rect.centery, None))
+        return events
+
+    def step_sprites(self, events):
+        self.bird_grid.build(self.bird_group)
+        self.collide_player_birds(events)
+
+        # Bullets that left the screen this tick can still hit a bird entering it
+        bullets = self.bullet_group.sprites()
+        for bullet in bullets:
+            bullet.update(self.width)
+        self.collide_bullets_birds(bullets, events)
+
+        self.bird_group.update()
+        self.cloud_group.update()
+        self.heart_pickup_group.update()
+        self.cloud_grid.build(self.cloud_group)
+        self.heart_grid.build(self.heart_pickup_group)
+        self.collide_player_pickups(events)
+
+    # step_sprites() on the entity arrays: the same moves and hits in the same order
+    def step_arrays(self, events):
+        player, world = self.player, self.entities
+        rect = player.rect
+        for _ in world.birds.collide(rect):
+            player.lives -= 1
+            events.append(Event('collision', rect.centerx, rect.centery, 'bird'))
+
+        # Bullets that left the screen this tick can still hit a bird entering it
+        world.bullets.step(compact=False)
+        for x, y in world.collide_bullets_birds():
+            player.score += 1
+            events.append(Event('hit_bird', x, y, None))
+
+        world.birds.step()
+        world.clouds.step()
+        world.hearts.step()
+        for x, y in world.hearts.collide(rect):
+            player.lives = min(player.lives + 1, 3)
+            events.append(Event('pickup_heart', x, y, None))
+        for x, y in world.clouds.collide(rect):
+            player.lives -= 1
+            events.append(Event('collision', x, y, 'cloud'))
+
+    # Collision passes, split out of step() so they can be measured on their own.
+    # They query the grids built earlier in the tick; killed sprites are skipped.
+    def collide_player_birds(self, events):
+        player = self.player
+        for bird in self.bird_grid.colliding(player, self.narrow_phase):
+            bird.kill()
+            player.lives -= 1
+            events.append(Event('collision', player.rect.centerx, player.rect.centery, 'bird'))
+
+    # A bullet kills every bird it overlaps but scores once; pairs() come grouped by bullet
+    def collide_bullets_birds(self, bullets, events):
+        scored = None
+        for bullet, bird in self.bird_grid.pairs(bullets, self.narrow_phase):
+            bird.kill()
+            if bullet is not scored:
+                scored = bullet
+                self.player.score += 1
+                events.append(Event('hit_bird', bullet.rect.centerx, bullet.rect.centery, None))
+                bullet.kill()
+
+    def collide_player_pickups(self, events):
+        player = self.player
+        for heart in self.heart_grid.colliding(player, self.narrow_phase):
+            heart.kill()
+            player.lives = min(player.lives + 1, 3)
+            events.append(Event('pickup_heart', heart.rect.centerx, heart.rect.centery, None))
+
+        for cloud in self.cloud_grid.colliding(player, self.narrow_phase):
+            cloud.kill()
+            player.lives -= 1
+            events.append(Event('collision', cloud.rect.centerx, cloud.rect.centery, 'cloud'))
@@ -0,0 +1,258 @@
+from collections import namedtuple
+import numpy as np
+
+# Optional structure-of-arrays entity backend, used by GameEngine(backend='numpy').
+# Instead of one Sprite object per bullet, bird, cloud or heart, each kind keeps its
+# positions, velocities, animation phases and alive flags in NumPy arrays, so moving,
+# animating, culling and testing every entity against the player or the bullets take a
+# few array operations per tick instead of one Python update() per object. Only drawing
+# touches pygame surfaces, through blits(). Collisions are bounding boxes only.
+#
+# NumPy is only imported by this module, and nothing imports this module unless the
+# backend is used, so the sprite path keeps running without NumPy installed.
+
+# direction: +1 moves right, -1 moves left; speed: pixels per tick when spawn() is not
+# given one; track_speed: speed of the separate x used for culling (birds leave on an
+# x that moves 2 px per tick whatever their speed), None to cull on the position;
+# anim_frames: animation wrap, 0 to count up forever; cull: 'left' (x < 0),
+# 'left_edge' (x < -width) or 'right' (x > world width)
+EntityKind = namedtuple('EntityKind', 'name direction speed track_speed anim_rate anim_frames cull')
+
+# The same movement, animation and culling as the update() of the sprites in engine.py
+KINDS = {
+    'bullet': EntityKind('bullet', 1, 4, None, 0.2, 0, 'right'),
+    'bird': EntityKind('bird', -1, 2, 2, 0.25, 4, 'left'),
+    'cloud': EntityKind('cloud', -1, 1, None, 0, 0, 'left_edge'),
+    'heart': EntityKind('heart', -1, 2, None, 0, 0, 'left'),
+}
+
+
+class EntityArrays:
+    FIELDS = {
+        'x': np.float64, 'y': np.float64, 'prev_x': np.float64, 'prev_y': np.float64,
+        'w': np.int32, 'h': np.int32, 'speed': np.float64, 'track': np.float64,
+        'anim': np.float64, 'variant': np.int32, 'alive': np.bool_,
+    }
+
+    def __init__(self, kind, world_width, capacity=64):
+        self.kind = kind
+        self.world_width = world_width
+        self.count = 0
+        self.capacity = capacity
+        for name, dtype in self.FIELDS.items():
+            setattr(self, name, np.zeros(capacity, dtype))
+        self.spawned = 0
+        self.culled = 0
+        self.killed = 0
+
+    def __len__(self):
+        return self.count
+
+    # The live part of one field
+    def field(self, name):
+        return getattr(self, name)[:self.count]
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        for name, dtype in self.FIELDS.items():
+            array = np.zeros(capacity, dtype)
+            array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def spawn(self, x, y, size, speed=None, variant=0):
+        if self.count == self.capacity:
+            self._grow(self.count + 1)
+        i = self.count
+        self.x[i] = self.prev_x[i] = self.track[i] = x
+        self.y[i] = self.prev_y[i] = y
+        self.w[i], self.h[i] = size
+        self.speed[i] = self.kind.speed if speed is None else speed
+        self.anim[i] = 0
+        self.variant[i] = variant
+        self.alive[i] = True
+        self.count += 1
+        self.spawned += 1
+        return i
+
+    # Move, animate and cull every entity of this kind by one tick. With compact=False
+    # culled entities stay in the arrays, marked dead, until the next compact()
+    def step(self, compact=True):
+        n = self.count
+        if not n:
+            return
+        kind = self.kind
+        x, y = self.x[:n], self.y[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        x += kind.direction * self.speed[:n]
+
+        if kind.anim_rate:
+            anim = self.anim[:n]
+            anim += kind.anim_rate
+            if kind.anim_frames:
+                np.mod(anim, kind.anim_frames, out=anim)
+
+        if kind.track_speed is None:
+            track = x
+        else:
+            track = self.track[:n]
+            track += kind.direction * kind.track_speed
+
+        if kind.cull == 'left':
+            gone = track < 0
+        elif kind.cull == 'left_edge':
+            gone = track < -self.w[:n]
+        else:
+            gone = track > self.world_width
+        if gone.any():
+            self.alive[:n] &= ~gone
+            self.culled += int(gone.sum())
+            if compact:
+                self.compact()
+
+    # Indices, in spawn order, of the entities whose box overlaps rect
+    def overlapping(self, rect):
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        hit = (x < rect.right) & (x + self.w[:n] > rect.left) & (y < rect.bottom) & (y + self.h[:n] > rect.top)
+        return np.flatnonzero(hit)
+
+    def centers(self, indices):
+        return list(zip((self.x[indices] + self.w[indices] // 2).astype(int).tolist(),
+                        (self.y[indices] + self.h[indices] // 2).astype(int).tolist()))
+
+    # Kill every entity whose box overlaps rect; returns their centres in spawn order
+    def collide(self, rect):
+        indices = self.overlapping(rect)
+        if not len(indices):
+            return []
+        centers = self.centers(indices)
+        self.kill(indices)
+        return centers
+
+    def kill(self, indices):
+        if len(indices):
+            self.alive[indices] = False
+            self.killed += len(indices)
+            self.compact()
+
+    # Drop dead entries, keeping the survivors in spawn order
+    def compact(self):
+        n = self.count
+        keep = self.alive[:n]
+        if keep.all():
+            return
+        alive = int(keep.sum())
+        for name in self.FIELDS:
+            array = getattr(self, name)
+            array[:alive] = array[:n][keep]
+        self.count = alive
+
+    def clear(self):
+        self.count = 0
+
+    # One tuple of plain Python values per live entity, in spawn order
+    def rows(self, *names):
+        return list(zip(*(self.field(name).tolist() for name in names)))
+
+    def set_prev(self, i, pos):
+        if pos is not None:
+            self.prev_x[i], self.prev_y[i] = pos
+
+    # (image, position) pairs for Surface.blits(); images[variant] is that variant's
+    # animation frames, and positions are interpolated like timestep.interpolated_blits
+    def blits(self, images, alpha=1):
+        n = self.count
+        prev_x, prev_y = self.prev_x[:n], self.prev_y[:n]
+        xs = np.rint(prev_x + (self.x[:n] - prev_x) * alpha).astype(int).tolist()
+        ys = np.rint(prev_y + (self.y[:n] - prev_y) * alpha).astype(int).tolist()
+        frames = self.anim[:n].astype(int).tolist()
+        return [(images[v][frame % len(images[v])], (x, y))
+                for v, frame, x, y in zip(self.variant[:n].tolist(), frames, xs, ys)]
+
+    def stats(self):
+        return {'count': self.count, 'capacity': self.capacity, 'spawned': self.spawned, 'culled': self.culled, 'killed': self.killed}
+
+
+# Every entity kind of one game
+class EntityWorld:
+    def __init__(self, width, height, capacity=64):
+        self.width, self.height = width, height
+        self.kinds = {name: EntityArrays(kind, width, capacity) for name, kind in KINDS.items()}
+        self.bullets = self.kinds['bullet']
+        self.birds = self.kinds['bird']
+        self.clouds = self.kinds['cloud']
+        self.hearts = self.kinds['heart']
+
+    def step(self):
+        for arrays in self.kinds.values():
+            arrays.step()
+
+    # Kills every bird, cloud and heart touching the player's rect and returns the
+    # centres of the ones hit, per kind
+    def collide_player(self, rect):
+        return {arrays.kind.name: arrays.collide(rect) for arrays in (self.birds, self.clouds, self.hearts)}
+
+    # Bullets in spawn order: each one kills every bird it overlaps that an earlier bullet
+    # has not, and dies if it killed any. Bullets culled but not yet compacted still hit.
+    # Returns the centres of the bullets that hit.
+    def collide_bullets_birds(self):
+        bullets, birds = self.bullets, self.birds
+        n, m = bullets.count, birds.count
+        hits = []
+        if n and m:
+            x, y = bullets.x[:n, None], bullets.y[:n, None]
+            overlap = ((x < birds.x[:m] + birds.w[:m]) & (x + bullets.w[:n, None] > birds.x[:m]) &
+                       (y < birds.y[:m] + birds.h[:m]) & (y + bullets.h[:n, None] > birds.y[:m]))
+            alive = birds.alive[:m]
+            for i in np.flatnonzero(overlap.any(axis=1)).tolist():
+                hit = overlap[i] & alive
+                if hit.any():
+                    alive &= ~hit
+                    birds.killed += int(hit.sum())
+                    hits.append(i)
+            birds.compact()
+        centers = bullets.centers(hits)
+        bullets.alive[hits] = False
+        bullets.killed += len(hits)
+        bullets.compact()
+        return centers
+
+    # The entities in the layout of GameEngine.snapshot(), so a state saved with either
+    # backend restores into the other; colors[variant] is a bird's colour
+    def snapshot(self, colors):
+        return {
+            'bullets': tuple(((x, y, w, h), anim, (px, py)) for x, y, w, h, anim, px, py
+                             in self.bullets.rows('x', 'y', 'w', 'h', 'anim', 'prev_x', 'prev_y')),
+            'birds': tuple((track, y, (x, y, w, h), colors[variant], speed, anim, (px, py)) for x, y, w, h, track, variant, speed, anim, px, py
+                           in self.birds.rows('x', 'y', 'w', 'h', 'track', 'variant', 'speed', 'anim', 'prev_x', 'prev_y')),
+            'clouds': tuple((x, y, (x, y, w, h), speed, (px, py)) for x, y, w, h, speed, px, py
+                            in self.clouds.rows('x', 'y', 'w', 'h', 'speed', 'prev_x', 'prev_y')),
+            'hearts': tuple((x, y, (x, y, w, h), speed, (px, py)) for x, y, w, h, speed, px, py
+                            in self.hearts.rows('x', 'y', 'w', 'h', 'speed', 'prev_x', 'prev_y')),
+        }
+
+    def restore(self, state, colors):
+        self.clear()
+        bullets, birds = self.bullets, self.birds
+        for rect, anim, prev_pos in state['bullets']:
+            i = bullets.spawn(rect[0], rect[1], rect[2:])
+            bullets.anim[i] = anim
+            bullets.set_prev(i, prev_pos)
+        for x, y, rect, color, speed, anim, prev_pos in state['birds']:
+            i = birds.spawn(rect[0], rect[1], rect[2:], speed, colors.index(color))
+            birds.track[i], birds.anim[i] = x, anim
+            birds.set_prev(i, prev_pos)
+        for arrays, name in ((self.clouds, 'clouds'), (self.hearts, 'hearts')):
+            for x, y, rect, speed, prev_pos in state[name]:
+                arrays.set_prev(arrays.spawn(rect[0], rect[1], rect[2:], speed), prev_pos)
+
+    def clear(self):
+        for arrays in self.kinds.values():
+            arrays.clear()
+
+    def stats(self):
+        return {name: arrays.stats() for name, arrays in self.kinds.items()}
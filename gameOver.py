@@ -1,18 +1,22 @@
 import pygame
-import sys
 import config
-from menu import Button
+from config import global_music
+from widgets import Button, get_font
+from assets import global_asset_manager as assets
+from screen_loop import DirtyScreen
+from scenes import StaticScene
+from text_effects import render_text
 
 # part hana: game over screen 
-class GameOverScreen:
-    def __init__(self, screen, font_path):
-        self.screen = screen
+# Pushed over the gameplay scene; the button pressed is popped back to it as the result
+class GameOverScreen(StaticScene):
+    def __init__(self, manager, font_path="fonts/Pixel Emulator.otf"):
+        super().__init__(manager)
+        screen = self.screen
         self.font_path = font_path
-        self.running = True
-        self.choice = None
+        self.snapshot = None
 
-        self.bg = pygame.image.load("images/bg.png").convert()
-        self.bg = pygame.transform.scale(self.bg, (screen.get_width(), screen.get_height()))
+        self.bg = assets.image("images/bg.png", size=screen.get_size(), alpha=False)
 
         self.panel_width, self.panel_height = 500, 450
         self.panel_rect = pygame.Rect(
@@ -22,8 +26,8 @@ class GameOverScreen:
         )
 
         self.button_size = (240, 50)
-        self.title_font = pygame.font.Font(font_path, 36)
-        self.text_font = pygame.font.Font(font_path, 26)
+        self.title_font = get_font(font_path, 36)
+        self.text_font = get_font(font_path, 26)
 
         self.play_again_button = Button("Play Again", (self.panel_rect.centerx, self.panel_rect.top + 230), self.button_size, font_path, self.play_again)
         self.menu_button = Button("Main Menu", (self.panel_rect.centerx, self.panel_rect.top + 290), self.button_size, font_path, self.return_to_menu)
@@ -32,25 +36,26 @@ class GameOverScreen:
         self.buttons = [self.play_again_button, self.menu_button, self.quit_button]
 
     def play_again(self):
-        self.choice = "restart"
-        self.running = False
+        self.manager.pop("restart")
 
     def return_to_menu(self):
-        self.choice = "menu"
-        self.running = False
+        self.manager.pop("menu")
 
     def quit_game(self):
-        self.choice = "quit"
-        self.running = False
+        self.manager.quit()
 
-    def show(self, latest_score, highest_score):
-        if config.audio_enabled:
-            pygame.mixer.fadeout(1000)  # fade out ALL channels including SFX
-            pygame.time.delay(1000)
-            pygame.mixer.music.load('audio/game_over.mp3')
-            pygame.mixer.music.play(-1)
+    # The panel is shown straight away over a snapshot of the last gameplay frame, which
+    # fades out while the sound fades; the game-over music starts once that is done.
+    def enter(self, latest_score, highest_score, fade_ms=1000):
+        # nothing to fade without a mixer, e.g. on a machine with no audio device
+        if config.audio_enabled and config.init_audio():
+            pygame.mixer.fadeout(fade_ms)  # fade out ALL channels including SFX
+            self.transitions.after(fade_ms, lambda: global_music.play('game_over'))
 
-        title_text = self.title_font.render("GAME OVER", True, (255, 255, 255))
+        self.snapshot = self.screen.copy()
+        self.transitions.tween(fade_ms, self.fade_snapshot, self.end_fade)
+
+        title_text = render_text(self.title_font, "GAME OVER", (255, 255, 255))
         title_rect = title_text.get_rect(center=(self.panel_rect.centerx, self.panel_rect.top + 40))
 
         score_text = self.text_font.render(f"Your Score: {latest_score}", True, (255, 255, 255))
@@ -59,25 +64,45 @@ class GameOverScreen:
         high_score_text = self.text_font.render(f"High Score: {highest_score}", True, (255, 255, 255))
         high_score_rect = high_score_text.get_rect(center=(self.panel_rect.centerx, self.panel_rect.top + 150))
 
-        while self.running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                for btn in self.buttons:
-                    btn.check_click(event)
-
-            self.screen.blit(self.bg, (0, 0))
-            pygame.draw.rect(self.screen, (44, 62, 80), self.panel_rect)
-            pygame.draw.rect(self.screen, (255, 255, 255), self.panel_rect, 3)
-            self.screen.blit(title_text, title_rect)
-            self.screen.blit(score_text, score_rect)
-            self.screen.blit(high_score_text, high_score_rect)
-
-            for btn in self.buttons:
-                btn.draw(self.screen)
-
-            pygame.display.flip()
-
-        pygame.mixer.music.stop()
-        return self.choice
\ No newline at end of file
+        self.panel = pygame.Surface(self.panel_rect.size).convert()
+        self.panel.fill((44, 62, 80))
+        pygame.draw.rect(self.panel, (255, 255, 255), self.panel.get_rect(), 3)
+        offset = (-self.panel_rect.left, -self.panel_rect.top)
+        self.panel.blit(title_text, title_rect.move(offset))
+        self.panel.blit(score_text, score_rect.move(offset))
+        self.panel.blit(high_score_text, high_score_rect.move(offset))
+
+        def draw_static(surface):
+            surface.blit(self.bg, (0, 0))
+            surface.blit(self.panel, self.panel_rect)
+
+        # the scores differ per visit, so the static layer is rebuilt each time
+        self.view = DirtyScreen(self.screen, draw_static)
+        for btn in self.buttons:
+            self.view.add_button(btn)
+
+    def fade_snapshot(self, t):
+        self.snapshot.set_alpha(int(255 * (1 - t)))
+
+    def end_fade(self):
+        self.snapshot = None
+        self.view.invalidate()
+
+    def draw(self):
+        if self.snapshot is None:
+            return self.view.draw()
+        self.screen.blit(self.bg, (0, 0))
+        self.screen.blit(self.snapshot, (0, 0))
+        self.screen.blit(self.panel, self.panel_rect)
+        for btn in self.buttons:
+            btn.draw(self.screen)
+        return None
+
+    def exit(self):
+        super().exit()
+        self.snapshot = None
+        global_music.stop()
+
+    def handle_event(self, event):
+        for btn in self.buttons:
+            btn.check_click(event)
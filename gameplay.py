@@ -1,421 +1,457 @@
 import pygame
 from pygame.locals import *
-from PIL import Image
-import random
-from menu import Button, scale_image
-from gameplaySettings import show_gameplay_settings
+from widgets import Button, get_font
 import config
-from config import global_sound_manager
-from gameOver import GameOverScreen
-
-def show_tutorial(screen, font_path):
-    bg = pygame.image.load('images/bg.png').convert()
-    bg = pygame.transform.scale(bg, (screen.get_width(), screen.get_height()))
-    
-    # Load button icons
-    up_icon = scale_image(pygame.image.load('images/up.png').convert_alpha(), 50)
-    down_icon = scale_image(pygame.image.load('images/down.png').convert_alpha(), 50)
-    space_icon = scale_image(pygame.image.load('images/space.png').convert_alpha(), 150)
-    
-    # Create fonts
-    title_font = pygame.font.Font(font_path, 40)
-    instruction_font = pygame.font.Font(font_path, 24)
-    
-    # Create text surfaces
-    title_text = title_font.render("START GAMEPLAY", True, (0, 0, 0))
-    score_text = instruction_font.render("SCORE: 0", True, (0, 0, 0))
-    instruction_text = instruction_font.render("Press key to move up or down", True, (0, 0, 0))
-    shoot_text = instruction_font.render("Press SPACE to shoot", True, (0, 0, 0))
-    
-    # Positions
-    center_x = screen.get_width() // 2
-    title_pos = (center_x, 100)
-    score_pos = (center_x, 160)
-    instruction_pos = (center_x, 220)
-    up_pos = (center_x - 100, 300)
-    down_pos = (center_x, 300)
-    space_pos = (center_x + 100, 300)
-    shoot_text_pos = (center_x, 370)
-    
-    # Display tutorial
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == QUIT:
-                pygame.quit()
-                return False
-            if event.type == KEYDOWN or event.type == MOUSEBUTTONDOWN:
-                waiting = False
-        
-        screen.blit(bg, (0, 0))
-        
-        # Draw title and instructions
-        screen.blit(title_text, (title_pos[0] - title_text.get_width() // 2, title_pos[1]))
-        screen.blit(score_text, (score_pos[0] - score_text.get_width() // 2, score_pos[1]))
-        screen.blit(instruction_text, (instruction_pos[0] - instruction_text.get_width() // 2, instruction_pos[1]))
-        
-        # Draw control icons
-        screen.blit(up_icon, (up_pos[0] - up_icon.get_width() // 2, up_pos[1]))
-        screen.blit(down_icon, (down_pos[0] - down_icon.get_width() // 2, down_pos[1]))
-        screen.blit(space_icon, (space_pos[0] - space_icon.get_width() // 2, space_pos[1]))
-        
-        # Draw shoot instruction
-        screen.blit(shoot_text, (shoot_text_pos[0] - shoot_text.get_width() // 2, shoot_text_pos[1]))
-        
-        pygame.display.flip()
-    
-    return True
-
-# Main game loop
-def run_game():
-    pygame.init()
-    pygame.mixer.init()
-    global_sound_manager.play('helicopter_continuous', loop=True)
-    # Initialize high score
-    high_score = 0
-
-    # Game settings
-    game_width, game_height = 800, 500
-    padding_y = 50
-    bullet_cooldown = 500
-    font_path = "fonts/Pixel Emulator.otf"
-
-    difficulty_level = 0
-    bird_spawn_interval = 1000
-    initial_bird_speed = 2
-    bird_speed = initial_bird_speed
-    max_clouds_allowed = 0 # Start with 0 clouds allowed before difficulty_level 1
-    cloud_spawn_interval = 3000 # Increased initial interval for spawning cloud bursts
-
-    screen_size = (game_width, game_height)
-    game_window = pygame.display.set_mode(screen_size)
-    pygame.display.set_caption('Bird-Shooter')
-
-    if not show_tutorial(game_window, font_path):
-        return 
-
-    settings_button = Button(
-        text="",
-        pos=(game_width - 45, 25),
-        size=(90, 90),
-        font_path=font_path,
-        callback=lambda: show_gameplay_settings(game_window, play_again_callback=reset_game),
-        icon_path="images/icons/s.png"
-    )
-
-    # Load images
-    bg = scale_image(pygame.image.load('images/bg.png').convert_alpha(), game_width)
-    airplane_images = [scale_image(pygame.image.load(f'images/player/fly{i}.png').convert_alpha(), 70) for i in range(2)]
-    heart_images = [scale_image(pygame.image.load(f'images/hearts/heart{i}.png').convert_alpha(), 30) for i in range(8)]
-    bird_images = {
-        color: [
-            pygame.transform.flip(scale_image(pygame.image.load(f'images/birds/{color}{i}.png').convert_alpha(), 50), True, False)
-            for i in range(4)
-        ] for color in ['blue', 'grey', 'red', 'yellow']
-    }
-    cloud_img = scale_image(pygame.image.load('images/cloud.png').convert_alpha(), 100)
-    explosion_img = scale_image(pygame.image.load('images/explosion.png').convert_alpha(), 100)
-    level_up_img = scale_image(pygame.image.load('images/level_up.png').convert_alpha(), 200)
-    heart_pickup_img = scale_image(pygame.image.load(f'images/hearts/heart0.png').convert_alpha(), 30)
-    pick_up_effect_img = scale_image(pygame.image.load('images/pick_up effect.png').convert_alpha(), 30)
-
-    # Sprite classes
-    class Explosion(pygame.sprite.Sprite):
-        def __init__(self, x, y):
-            super().__init__()
-            self.image = explosion_img
-            self.rect = self.image.get_rect(center=(x, y))
-            self.timer = pygame.time.get_ticks()
-
-        def update(self):
-            if pygame.time.get_ticks() - self.timer > 300:
-                self.kill()
-
-    class Player(pygame.sprite.Sprite):
-        def __init__(self, x, y):
-            super().__init__()
-            self.x, self.y, self.lives, self.score, self.image_index, self.image_angle = x, y, 3, 0, 0, 0
-
-            self.image = airplane_images[0]  # Use first frame as initial image
-            self.rect = self.image.get_rect(topleft=(self.x, self.y))
-        
-        def update(self):
-            self.image_index = (self.image_index + 1) % len(airplane_images)
-            self.image = pygame.transform.rotate(airplane_images[self.image_index], self.image_angle)
-            self.rect = self.image.get_rect(topleft=(self.x, self.y))
-            if pygame.sprite.spritecollide(self, bird_group, True):
-                explosion_group.add(Explosion(self.rect.centerx, self.rect.centery))
-                self.lives -= 1
+from config import global_sound_manager, global_music
+from sprite_cache import global_animation_cache, RotationTable
+from assets import global_asset_manager as assets
+from hud import HUD
+from preloader import global_preloader
+from replay import InputRecorder, INPUT_SETTINGS, FLAG_PIXEL_PERFECT, read_recordings, check_rules
+from scenario import load_state
+from screen_loop import DirtyScreen
+from scenes import Scene, StaticScene
+from pool import PooledSprite, SpritePool, release_all
+from timestep import FixedTimestep, remember_positions, interpolated_blits
+from layers import LayeredRenderer, ScrollingBackground, SpriteLayer, CachedLayer
+import engine as engine_module
+from engine import GameEngine, GAME_WIDTH, TICK_RATE, BIRD_COLORS, PLAYER_ANGLES, ACTION_UP, ACTION_DOWN, ACTION_SHOOT
+
+# Shown each time a game is started from the menu; any key or click starts playing
+class TutorialScene(StaticScene):
+    def build_view(self):
+        global_preloader.wait('gameplay')
+        screen = self.screen
+        font_path = "fonts/Pixel Emulator.otf"
+        bg = assets.image('images/bg.png', size=screen.get_size(), alpha=False)
+
+        # Load button icons
+        up_icon = assets.image('images/up.png', width=50)
+        down_icon = assets.image('images/down.png', width=50)
+        space_icon = assets.image('images/space.png', width=150)
+
+        # Create fonts
+        title_font = get_font(font_path, 40)
+        instruction_font = get_font(font_path, 24)
+
+        # Create text surfaces
+        title_text = title_font.render("START GAMEPLAY", True, (0, 0, 0))
+        score_text = instruction_font.render("SCORE: 0", True, (0, 0, 0))
+        instruction_text = instruction_font.render("Press key to move up or down", True, (0, 0, 0))
+        shoot_text = instruction_font.render("Press SPACE to shoot", True, (0, 0, 0))
+
+        # Positions
+        center_x = screen.get_width() // 2
+        title_pos = (center_x, 100)
+        score_pos = (center_x, 160)
+        instruction_pos = (center_x, 220)
+        up_pos = (center_x - 100, 300)
+        down_pos = (center_x, 300)
+        space_pos = (center_x + 100, 300)
+        shoot_text_pos = (center_x, 370)
+
+        def draw_static(surface):
+            surface.blit(bg, (0, 0))
+
+            # Draw title and instructions
+            surface.blit(title_text, (title_pos[0] - title_text.get_width() // 2, title_pos[1]))
+            surface.blit(score_text, (score_pos[0] - score_text.get_width() // 2, score_pos[1]))
+            surface.blit(instruction_text, (instruction_pos[0] - instruction_text.get_width() // 2, instruction_pos[1]))
+
+            # Draw control icons
+            surface.blit(up_icon, (up_pos[0] - up_icon.get_width() // 2, up_pos[1]))
+            surface.blit(down_icon, (down_pos[0] - down_icon.get_width() // 2, down_pos[1]))
+            surface.blit(space_icon, (space_pos[0] - space_icon.get_width() // 2, space_pos[1]))
+
+            # Draw shoot instruction
+            surface.blit(shoot_text, (shoot_text_pos[0] - shoot_text.get_width() // 2, shoot_text_pos[1]))
+
+        # Nothing on the tutorial changes, so after the first frame there is nothing to present
+        return DirtyScreen(screen, draw_static)
+
+    def handle_event(self, event):
+        if event.type == KEYDOWN or event.type == MOUSEBUTTONDOWN:
+            self.manager.replace('gameplay')
+
+# Visual-only sprites; they do not affect the simulation. Both are pooled.
+class Explosion(PooledSprite):
+    def __init__(self, image, x, y, now):
+        super().__init__()
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.reset(image, x, y, now)
+
+    def reset(self, image, x, y, now):
+        self.image = image
+        self.rect.size = image.get_size()
+        self.rect.center = (x, y)
+        self.timer = now
+
+    def update(self, now):
+        if now - self.timer > 300:
+            self.kill()
+
+
+class PickUpEffect(PooledSprite):
+    fade_speed = 5
+
+    def __init__(self, fade_frames, x, y):
+        super().__init__()
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.reset(fade_frames, x, y)
+
+    def reset(self, fade_frames, x, y):
+        # fade_frames[i] is the effect image at alpha 255 - i * fade_speed, shared by all effects
+        self.fade_frames = fade_frames
+        self.image = fade_frames[0]
+        self.rect.size = self.image.get_size()
+        self.rect.center = (x, y)
+        self.alpha = 255
+        self.y_speed = -1
+        self.prev_pos = None
+
+    def update(self, now):
+        self.alpha -= self.fade_speed
+        self.rect.y += self.y_speed
+        if self.alpha <= 0:
+            self.kill()
+        else:
+            self.image = self.fade_frames[(255 - self.alpha) // self.fade_speed]
+
+
+def build_fade_frames(image, step):
+    frames = []
+    for alpha in range(255, 0, -step):
+        frame = image.copy()
+        frame.set_alpha(alpha)
+        frames.append(frame)
+    return tuple(frames)
+
+
+# Queues everything the tutorial and GameView load, with the same sizes, so that
+# starting a game finds them already decoded
+def preload_assets(preloader, screen_size, group='gameplay'):
+    width = screen_size[0]
+    preloader.add_image(group, 'images/bg.png', size=screen_size, alpha=False)
+    for path, icon_width in (('images/up.png', 50), ('images/down.png', 50), ('images/space.png', 150)):
+        preloader.add_image(group, path, width=icon_width)
+    preloader.add_image(group, 'images/bg.png', width=width, alpha=False)
+    for i in range(2):
+        preloader.add_image(group, f'images/player/fly{i}.png', width=70)
+    for i in range(8):
+        preloader.add_image(group, f'images/hearts/heart{i}.png', width=30)
+    for color in BIRD_COLORS:
+        for i in range(4):
+            preloader.add_image(group, f'images/birds/{color}{i}.png', width=50, flip_x=True)
+    preloader.add_image(group, 'images/cloud.png', width=100)
+    preloader.add_image(group, 'images/explosion.png', width=100)
+    preloader.add_image(group, 'images/level_up.png', width=200)
+    preloader.add_image(group, 'images/pick_up effect.png', width=30)
+    preloader.add_animation(group, 'images/Bullet.gif', (20, 20))
+    for name in global_sound_manager.sound_paths:
+        preloader.add_sound(group, name)
+    preloader.add_music(group, 'game_over')
+
+
+# Everything gameplay draws: loads the sprite images, turns engine events into sounds
+# and effects, and renders one frame of a GameEngine onto a surface.
+class GameView:
+    def __init__(self, surface):
+        self.surface = surface
+        self.width, self.height = surface.get_size()
+
+        # Load images
+        self.bg = assets.image('images/bg.png', width=self.width, alpha=False)
+        self.airplane_images = [assets.image(f'images/player/fly{i}.png', width=70) for i in range(2)]
+        self.airplane_rotations = RotationTable(self.airplane_images, PLAYER_ANGLES)
+        self.heart_images = [assets.image(f'images/hearts/heart{i}.png', width=30) for i in range(8)]
+        self.bird_images = {
+            color: [assets.image(f'images/birds/{color}{i}.png', width=50, flip_x=True) for i in range(4)]
+            for color in BIRD_COLORS
+        }
+        self.cloud_img = assets.image('images/cloud.png', width=100)
+        self.explosion_img = assets.image('images/explosion.png', width=100)
+        self.level_up_img = assets.image('images/level_up.png', width=200)
+        self.heart_pickup_img = assets.image('images/hearts/heart0.png', width=30)
+        self.pick_up_effect_img = assets.image('images/pick_up effect.png', width=30)
+        self.pick_up_fade_frames = build_fade_frames(self.pick_up_effect_img, PickUpEffect.fade_speed)
+        self.bullet_frames = global_animation_cache.get_frames('images/Bullet.gif', (20, 20))
+
+        self.explosion_group, self.pick_up_effect_group = pygame.sprite.Group(), pygame.sprite.Group()
+        self.explosion_pool = SpritePool(Explosion, 32)
+        self.pick_up_effect_pool = SpritePool(PickUpEffect, 8)
+        # allocated up front, so the first explosions of a game do not allocate
+        self.explosion_pool.prefill(8, self.explosion_img, 0, 0, 0)
+        self.pick_up_effect_pool.prefill(2, self.pick_up_fade_frames, 0, 0)
+        self.heart_image_index = 0
+        self.hud = HUD(self.heart_images)
+        self.masks = {}
+        self.renderer = self.build_renderer()
+
+    # Layers in drawing order; each gets (engine, alpha) for the frame being drawn
+    def build_renderer(self):
+        def sprites(group_of, image_of=None):
+            return lambda frame: interpolated_blits(group_of(frame[0]), frame[1], image_of)
+
+        # Engine entities from whichever backend the engine runs; images[variant] are
+        # the animation frames EntityArrays.blits picks from
+        def entities(kind, group_of, image_of, images):
+            def blits(frame):
+                engine, alpha = frame
+                if engine.entities is not None:
+                    return engine.entities.kinds[kind].blits(images, alpha)
+                return interpolated_blits(group_of(engine), alpha, image_of)
+            return blits
+
+        level_up_pos = (self.width // 2 - self.level_up_img.get_width() // 2, self.height // 2 - self.level_up_img.get_height() // 2 -35)
+
+        # Shown while the score sits on a level the wave table marks with a banner
+        def level_up(frame):
+            engine = frame[0]
+            if engine.player.score in engine.waves.banner_scores:
+                yield self.level_up_img, level_up_pos
+
+        # The HUD only changes when lives, score or the heart animation frame do
+        hud = CachedLayer('hud', (self.width, self.hud.height()), (0, 0),
+                          lambda frame: (frame[0].player.lives, frame[0].player.score, int(self.heart_image_index)),
+                          lambda surface, frame: self.hud.draw(surface, frame[0].player, self.heart_image_index))
+
+        return LayeredRenderer(self.surface, ScrollingBackground(self.bg), [
+            SpriteLayer('player', sprites(lambda engine: engine.player_group, self.player_image)),
+            SpriteLayer('bullets', entities('bullet', lambda engine: engine.bullet_group, self.bullet_image, [self.bullet_frames])),
+            SpriteLayer('birds', entities('bird', lambda engine: engine.bird_group, self.bird_image, [self.bird_images[color] for color in BIRD_COLORS])),
+            SpriteLayer('clouds', entities('cloud', lambda engine: engine.cloud_group, lambda cloud: self.cloud_img, [[self.cloud_img]])),
+            SpriteLayer('explosions', sprites(lambda engine: self.explosion_group)),
+            SpriteLayer('hearts', entities('heart', lambda engine: engine.heart_pickup_group, lambda heart: self.heart_pickup_img, [[self.heart_pickup_img]])),
+            SpriteLayer('pick_up_effects', sprites(lambda engine: self.pick_up_effect_group)),
+            SpriteLayer('level_up', level_up),
+            hud,
+        ])
+
+    def engine_sizes(self):
+        # The engine collides with the same sizes the images are drawn at
+        airplane = self.airplane_images[0]
+        return {
+            'player': airplane.get_size(),
+            'player_rotated': {angle: self.airplane_rotations.size(angle) for angle in PLAYER_ANGLES},
+            'bullet': self.bullet_frames[0].get_size(),
+            'bird': {color: images[0].get_size() for color, images in self.bird_images.items()},
+            'cloud': self.cloud_img.get_size(),
+            'heart': self.heart_pickup_img.get_size(),
+        }
+
+    def reset(self):
+        release_all(self.explosion_group)
+        release_all(self.pick_up_effect_group)
+        # a new game opens over whatever screen came before it
+        self.invalidate()
+
+    def invalidate(self):
+        self.renderer.invalidate()
+
+    def pool_stats(self):
+        return {'explosion': self.explosion_pool.stats(), 'pick_up_effect': self.pick_up_effect_pool.stats()}
+
+    def handle_events(self, events, now):
+        for event in events:
+            if event.kind == 'bullet':
+                global_sound_manager.play('bullet')
+            elif event.kind == 'hit_bird':
+                self.explosion_group.add(self.explosion_pool.acquire(self.explosion_img, event.x, event.y, now))
+                global_sound_manager.play('hit_bird')
+            elif event.kind == 'collision':
+                self.explosion_group.add(self.explosion_pool.acquire(self.explosion_img, event.x, event.y, now))
                 global_sound_manager.play('collision')
+            elif event.kind == 'pickup_heart':
+                global_sound_manager.play('pickup_heart')
+                self.pick_up_effect_group.add(self.pick_up_effect_pool.acquire(self.pick_up_fade_frames, event.x, event.y))
+
+    # Advance visual effects by one simulation tick
+    def tick(self, engine, events):
+        remember_positions(self.pick_up_effect_group)
+        self.handle_events(events, engine.time)
+        self.explosion_group.update(engine.time)
+        self.pick_up_effect_group.update(engine.time)
+        self.heart_image_index = (self.heart_image_index + 0.1) % len(self.heart_images)
+
+    def player_image(self, player):
+        return self.airplane_rotations.get(player.image_index, player.image_angle)
+
+    def bullet_image(self, bullet):
+        return self.bullet_frames[int(bullet.frame_index) % len(self.bullet_frames)]
+
+    def bird_image(self, bird):
+        return self.bird_images[bird.color][int(bird.image_index)]
+
+    # Masks for the pixel-accurate narrow phase, one per distinct image
+    def mask_of(self, sprite):
+        if isinstance(sprite, engine_module.Player):
+            return self.airplane_rotations.mask(sprite.image_index, sprite.image_angle)
+        if isinstance(sprite, engine_module.Bird):
+            image = self.bird_image(sprite)
+        elif isinstance(sprite, engine_module.Bullet):
+            image = self.bullet_image(sprite)
+        elif isinstance(sprite, engine_module.Cloud):
+            image = self.cloud_img
+        elif isinstance(sprite, engine_module.HeartPickup):
+            image = self.heart_pickup_img
+        else:
+            return None
+        mask = self.masks.get(image)
+        if mask is None:
+            mask = self.masks[image] = pygame.mask.from_surface(image)
+        return mask
 
-    class Bullet(pygame.sprite.Sprite):
-        def __init__(self, x, y):
-            super().__init__()
-            self.frames = self.load_gif_frames('images/Bullet.gif')
-            self.frame_index, self.rect = 0, pygame.Rect(x, y, 20, 20)
-
-        def load_gif_frames(self, path):
-            pil_gif, frames = Image.open(path), []
-            try:
-                while True:
-                    frame = pil_gif.convert('RGBA')
-                    pygame_image = pygame.image.fromstring(frame.tobytes(), frame.size, frame.mode)
-                    frames.append(pygame.transform.scale(pygame_image, (20, 20)))
-                    pil_gif.seek(pil_gif.tell() + 1)
-            except EOFError:
-                pass
-            return frames
-
-        def update(self):
-            self.rect.x += 4
-            self.frame_index = (self.frame_index + 0.2) % len(self.frames)
-            self.image = self.frames[int(self.frame_index)]
-            if self.rect.x > game_width:
-                self.kill()
-            if pygame.sprite.spritecollide(self, bird_group, True):
-                explosion_group.add(Explosion(self.rect.centerx, self.rect.centery))
-                player.score += 1
-                global_sound_manager.play('hit_bird')
-                self.kill()
-
-        def draw(self):
-            game_window.blit(self.image, self.rect)
-
-    class Bird(pygame.sprite.Sprite):
-        def __init__(self, speed):
-            super().__init__()
-            self.x, self.y, self.color, self.image_index = game_width, random.randint(padding_y, game_height - padding_y * 2), random.choice(['blue', 'grey', 'red', 'yellow']), 0
-            self.image, self.speed = bird_images[self.color][0], speed
-            self.rect = self.image.get_rect(topleft=(self.x, self.y))
-
-        def update(self):
-            self.x -= 2
-            self.rect.x -= self.speed
-            self.image_index = (self.image_index + 0.25) % len(bird_images[self.color])
-            self.image = bird_images[self.color][int(self.image_index)]
-            if self.x < 0:
-                self.kill()
-
-    class Cloud(pygame.sprite.Sprite):
-        def __init__(self, offset_x=0): # Added offset_x for burst spawning
-            super().__init__()
-            # Randomize y position for each cloud in a burst
-            self.x, self.y = game_width + offset_x, random.randint(padding_y, game_height - padding_y * 2)
-            self.image, self.speed = cloud_img, bird_speed - 1 if bird_speed > 1 else 1
-            self.rect = self.image.get_rect(topleft=(self.x, self.y))
-
-        def update(self):
-            self.x -= self.speed
-            self.rect.x = self.x
-            if self.x < -self.image.get_width():
-                self.kill()
-
-    class HeartPickup(pygame.sprite.Sprite):
-        def __init__(self):
-            super().__init__()
-            self.x, self.y = game_width, random.randint(padding_y, game_height - padding_y * 2)
-            self.image, self.speed = heart_pickup_img, 2
-            self.rect = self.image.get_rect(topleft=(self.x, self.y))
-
-        def update(self):
-            self.x -= self.speed
-            self.rect.x = self.x
-            if self.x < 0:
-                self.kill()
-
-    class PickUpEffect(pygame.sprite.Sprite):
-        def __init__(self, x, y):
-            super().__init__()
-            self.image = pick_up_effect_img.copy()
-            self.rect = self.image.get_rect(center=(x, y))
-            self.alpha = 255
-            self.fade_speed = 5
-            self.y_speed = -1
-
-        def update(self):
-            self.alpha -= self.fade_speed
-            self.rect.y += self.y_speed
-            if self.alpha <= 0:
-                self.kill()
-            else:
-                self.image.set_alpha(self.alpha)
-
-
-    def increase_difficulty():
-        nonlocal difficulty_level, bird_spawn_interval, bird_speed, max_clouds_allowed, cloud_spawn_interval
-        difficulty_level += 1
-        bird_spawn_interval = max(500, bird_spawn_interval - 50)
-        if difficulty_level >= 1:
-            bird_speed += 1
-            # Increase max clouds allowed only after level 20 (difficulty_level 1)
-            if max_clouds_allowed < 10: # Cap max clouds to prevent too many
-                max_clouds_allowed += 1
-            cloud_spawn_interval = max(1500, cloud_spawn_interval - 200) # Faster cloud bursts
-
-    def reset_game():
-        nonlocal player, last_bullet_time, next_bird, next_heart_pickup, difficulty_level, bird_spawn_interval, bird_speed, max_clouds_allowed, cloud_spawn_interval, next_cloud, running
-        player_group.empty(), bullet_group.empty(), bird_group.empty(), cloud_group.empty(), explosion_group.empty(), heart_pickup_group.empty(), pick_up_effect_group.empty()
-        player = Player(30, game_height // 2)
-        player_group.add(player)
-        last_bullet_time, next_bird, next_heart_pickup = pygame.time.get_ticks(), pygame.time.get_ticks(), pygame.time.get_ticks()
+    # Draws one frame and returns the rects of the window that changed
+    def draw(self, engine, alpha=1):
+        scroll = (engine.bg_scroll - 1 + alpha) % self.width if engine.ticks else 0
+        return self.renderer.draw(scroll, (engine, alpha))
+
+
+# Optional callable run after every drawn gameplay frame (used by benchmark.py)
+frame_hook = None
+
+
+def resume_background_music():
+    if config.audio_enabled:
+        if not global_music.get_busy():
+            global_music.play('background', fade_ms=1000)
+        else:
+            global_music.unpause()
+    else:
+        global_music.pause()
+
+
+# Main game loop. The view, engine and pools are created on the first visit and reused
+# for every later game; entering the scene starts a fresh game.
+class GameplayScene(Scene):
+    fps = 60
+
+    def __init__(self, manager):
+        super().__init__(manager)
+        global_preloader.wait('gameplay')
+        # Initialize high score
+        self.high_score = 0
+
+        # Game settings
+        font_path = "fonts/Pixel Emulator.otf"
+
+        # Simulation runs at a fixed 120 ticks per second; rendering can run slower
+        self.sim_clock = FixedTimestep(tick_rate=TICK_RATE)
+        self.interpolate = True
+        pixel_perfect_collisions = False
+        self.recording_flags = FLAG_PIXEL_PERFECT if pixel_perfect_collisions else 0
+        self.recorder = InputRecorder(config.record_path) if config.record_path else None
+        self.playback = None
+        self.speed = 1
+
+        self.settings_button = Button(
+            text="",
+            pos=(GAME_WIDTH - 45, 25),
+            size=(90, 90),
+            font_path=font_path,
+            callback=self.open_settings,
+            icon_path="images/icons/s.png"
+        )
+
+        self.view = GameView(self.screen)
+        self.engine = GameEngine(sizes=self.view.engine_sizes(), mask_of=self.view.mask_of if pixel_perfect_collisions else None,
+                                 backend=config.engine_backend)
+
+    # recording: a replay.Recording to play back instead of reading the keyboard,
+    # speed: how many times faster than real time it plays, state: an engine snapshot
+    # to start from instead of a new game
+    def reset_game(self, recording=None, speed=1, state=None):
+        if self.recorder:
+            self.recorder.end(self.engine)
+        self.view.reset()
+        if state:
+            self.engine.restore(state)
+        else:
+            self.engine.reset(recording.seed if recording else None)
+        self.sim_clock.reset()
+        self.playback = recording.inputs() if recording else None
+        self.speed = speed
+        self.sim_clock.max_steps_per_frame = 8 * speed
+        # a recording only holds the seed, so games started from a state are not recorded
+        if self.recorder and not recording and not state:
+            self.recorder.start(self.engine, self.recording_flags)
         global_sound_manager.stop_all()
         global_sound_manager.play('helicopter_continuous', loop=True)
-        difficulty_level = 0
-        bird_spawn_interval = 1000
-        bird_speed = initial_bird_speed
-        max_clouds_allowed = 0 # Reset to 0 clouds allowed
-        cloud_spawn_interval = 3000 # Reset cloud spawn interval
-        next_cloud = pygame.time.get_ticks() + random.randint(500, cloud_spawn_interval)
-        running = True
-
-    # Groups
-    player_group, bullet_group, bird_group, cloud_group = pygame.sprite.Group(), pygame.sprite.Group(), pygame.sprite.Group(), pygame.sprite.Group()
-    explosion_group, heart_pickup_group = pygame.sprite.Group(), pygame.sprite.Group()
-    pick_up_effect_group = pygame.sprite.Group()
-
-    player = Player(30, game_height // 2)
-    player_group.add(player)
-
-    clock, fps = pygame.time.Clock(), 120
-    heart_image_index, bg_scroll, running = 0, 0, True
-    last_bullet_time, next_bird, next_heart_pickup = pygame.time.get_ticks(), pygame.time.get_ticks(), pygame.time.get_ticks()
-    next_cloud = pygame.time.get_ticks() + random.randint(500, cloud_spawn_interval)
-
-    while running:
-        current_time = pygame.time.get_ticks()
-
-        clock.tick(fps)
-        for event in pygame.event.get():
-            if event.type == QUIT:
-                running = False
-            settings_button.check_click(event)
 
-        keys = pygame.key.get_pressed()
-        if keys[K_UP] and player.rect.top > padding_y:
-            player.y -= 2
-            player.image_angle = 15
-        elif keys[K_DOWN] and player.rect.bottom < game_height - padding_y:
-            player.y += 2
-            player.image_angle = -15
-        else:
-            player.image_angle = 0
-
-        if keys[K_SPACE] and last_bullet_time + bullet_cooldown < current_time:
-            bullet_group.add(Bullet(player.x + airplane_images[0].get_width(), player.y + airplane_images[0].get_height() // 2))
-            last_bullet_time = current_time
-            global_sound_manager.play('bullet')
-
-        if current_time > next_bird:
-            bird_group.add(Bird(bird_speed))
-            next_bird = current_time + bird_spawn_interval + random.randint(-200, 200)
-
-        if player.lives < 3 and current_time > next_heart_pickup:
-            heart_pickup_group.add(HeartPickup())
-            next_heart_pickup = current_time + random.randint(4000, 7000)
-
-        # Cloud Spawning Logic (after difficulty level 1, in bursts)
-        if difficulty_level >= 1 and len(cloud_group) < max_clouds_allowed and current_time > next_cloud:
-            num_clouds_to_spawn = random.randint(3, 5)
-            # Ensure we don't exceed max_clouds_allowed with the burst
-            num_clouds_to_spawn = min(num_clouds_to_spawn, max_clouds_allowed - len(cloud_group))
-            
-            for i in range(num_clouds_to_spawn):
-                # Offset new clouds slightly to spread them out
-                cloud_group.add(Cloud(offset_x=i * random.randint(50, 100))) # Randomize spread
-            next_cloud = current_time + random.randint(1500, cloud_spawn_interval) # Next burst timer
-
-        # Level up logic
-        if player.score > 0 and player.score % 20 == 0 and difficulty_level < (player.score // 20):
-            increase_difficulty()
-
-        # Update
-        player_group.update()
-        bullet_group.update()
-        bird_group.update()
-        cloud_group.update()
-        explosion_group.update()
-        heart_pickup_group.update()
-        pick_up_effect_group.update()
-
-        for heart in pygame.sprite.spritecollide(player, heart_pickup_group, True):
-            player.lives = min(player.lives + 1, 3)
-            global_sound_manager.play('pickup_heart')
-            pick_up_effect = PickUpEffect(heart.rect.centerx, heart.rect.centery)
-            pick_up_effect_group.add(pick_up_effect)
-
-        for cloud in pygame.sprite.spritecollide(player, cloud_group, True):
-            player.lives -= 1
-            explosion_group.add(Explosion(cloud.rect.centerx, cloud.rect.centery))
-            global_sound_manager.play('collision')
-
-        # Draw
-        for offset in [0, game_width]:
-            game_window.blit(bg, (offset - bg_scroll, 0))
-        bg_scroll = (bg_scroll + 1) % game_width
-
-        player_group.draw(game_window)
-        for bullet in bullet_group:
-            bullet.draw()
-        bird_group.draw(game_window)
-        cloud_group.draw(game_window)
-        explosion_group.draw(game_window)
-        heart_pickup_group.draw(game_window)
-        pick_up_effect_group.draw(game_window)
-
-        if player.score in [20, 40, 60]:
-            game_window.blit(level_up_img, (game_width // 2 - level_up_img.get_width() // 2, game_height // 2 - level_up_img.get_height() // 2 -35))
-
-        for i in range(player.lives):
-            game_window.blit(heart_images[int(heart_image_index)], (10 + i * 40, 10))
-        heart_image_index = (heart_image_index + 0.1) % len(heart_images)
-
-        font = pygame.font.Font(None, 25)
-        score_text = font.render(f'Score: {player.score}', True, (0, 0, 0))
-        game_window.blit(score_text, (190, 15))
-
-        settings_button.draw(game_window)
-        pygame.display.update()
-
-        # Game Over
-        if player.lives <= 0:
+    # replay: recording file to play back, game: which game in it, skip_to: tick to
+    # fast-forward to without drawing, state: json state file (see scenario.py) to play from
+    def enter(self, replay=None, game=0, speed=1, skip_to=0, state=None, **kwargs):
+        recording = read_recordings(replay)[game] if replay else None
+        if recording:
+            check_rules(recording, self.engine)
+        self.reset_game(recording, speed, load_state(state) if state else None)
+        for _ in range(skip_to):
+            inputs = next(self.playback, None) if self.playback else None
+            if inputs is None or self.engine.game_over:
+                break
+            self.engine.step(inputs)
+
+    def exit(self):
+        super().exit()
+        if self.recorder:
+            self.recorder.end(self.engine)
+            self.recorder.close()
+        global_sound_manager.stop_all()
+
+    def open_settings(self):
+        if self.recorder:
+            self.recorder.mark(INPUT_SETTINGS)
+        self.manager.push('gameplay_settings')
+
+    def resume(self, result=None):
+        # Time spent in the settings or game-over screen must not be simulated afterwards
+        self.sim_clock.discard_pending()
+        # and what they drew over the game has to be pushed over again
+        self.view.invalidate()
+        if result == "restart":
+            resume_background_music()
+            self.reset_game()
+        elif result == "menu":
+            resume_background_music()
+            self.manager.pop()
+
+    def animating(self):
+        return True
+
+    def handle_event(self, event):
+        self.settings_button.check_click(event)
+
+    def update(self, frame_ms):
+        engine = self.engine
+        # Game Over (checked a frame late so the final frame is drawn first)
+        if engine.game_over:
             global_sound_manager.stop_all()
+            if self.recorder:
+                self.recorder.end(engine)
+            self.high_score = max(self.high_score, engine.player.score)
+            self.manager.push('game_over', latest_score=engine.player.score, highest_score=self.high_score)
+            return
 
-            if player.score > high_score:
-                high_score = player.score
-
-            game_over_screen = GameOverScreen(game_window, "fonts/Pixel Emulator.otf")
-            choice = game_over_screen.show(latest_score=player.score, highest_score=high_score)
-
-            if choice == "restart":
-                if config.audio_enabled:
-                    if not pygame.mixer.music.get_busy():
-                        try:
-                            pygame.mixer.music.load("audio/background_music.mp3")
-                            pygame.mixer.music.play(-1, fade_ms=1000)
-                        except Exception as e:
-                            print("Error loading background music:", e)
-                    else:
-                        pygame.mixer.music.unpause()
-                else:
-                    pygame.mixer.music.pause()
-                reset_game()
-
-
-            elif choice == "menu":
-                if config.audio_enabled:
-                    if not pygame.mixer.music.get_busy():
-                        try:
-                            pygame.mixer.music.load("audio/background_music.mp3")
-                            pygame.mixer.music.play(-1, fade_ms=1000)
-                        except Exception as e:
-                            print("Error loading background music:", e)
-                    else:
-                        pygame.mixer.music.unpause()
-                else:
-                    pygame.mixer.music.pause()
-                return
-
-            elif choice == "quit":
-                running = False
-
-    pygame.quit()
+        keys = pygame.key.get_pressed()
+        actions = (ACTION_UP if keys[K_UP] else 0) | (ACTION_DOWN if keys[K_DOWN] else 0) | (ACTION_SHOOT if keys[K_SPACE] else 0)
+        for _ in range(self.sim_clock.advance(frame_ms * self.speed)):
+            if self.playback is not None:
+                actions = next(self.playback, None)
+                if actions is None:
+                    # the recording ends here without a game over
+                    self.manager.quit()
+                    return
+            elif self.recorder:
+                self.recorder.record(actions)
+            self.view.tick(engine, engine.step(actions))
+            self.sim_clock.step()
+            if engine.game_over:
+                break
+
+    def draw(self):
+        dirty = self.view.draw(self.engine, self.sim_clock.alpha if self.interpolate else 1)
+        self.settings_button.draw(self.screen)
+        self.view.renderer.add_dirty(dirty, self.settings_button.rect)
+        if frame_hook:
+            frame_hook()
+        return dirty
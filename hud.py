@@ -0,0 +1,51 @@
+import pygame
+from widgets import get_font, render_label
+
+# In-game HUD. Fonts are created once and text is only rendered when it changes;
+# numbers that change quickly (score, lives, level, timers) are drawn from a
+# pre-rendered digit atlas so each one costs a few blits per frame.
+
+
+class DigitAtlas:
+    def __init__(self, font, color, characters='0123456789-:.'):
+        self.glyphs = {ch: font.render(ch, True, color) for ch in characters}
+        self.height = max(glyph.get_height() for glyph in self.glyphs.values())
+
+    def draw(self, surface, value, pos):
+        x, y = pos
+        for ch in str(value):
+            glyph = self.glyphs[ch]
+            surface.blit(glyph, (x, y))
+            x += glyph.get_width()
+        return pygame.Rect(pos[0], y, x - pos[0], self.height)
+
+
+class HUD:
+    def __init__(self, heart_images, font_path=None, font_size=25, color=(0, 0, 0)):
+        self.heart_images = heart_images
+        self.font = get_font(font_path, font_size)
+        self.color = color
+        self.digits = DigitAtlas(self.font, color)
+
+    def label(self, text):
+        return render_label(self.font, text, self.color)
+
+    # "<label><number>" with the label cached and the number drawn from the atlas
+    def draw_counter(self, surface, label, value, pos):
+        label_surf = self.label(label)
+        surface.blit(label_surf, pos)
+        digits_rect = self.digits.draw(surface, value, (pos[0] + label_surf.get_width(), pos[1]))
+        return label_surf.get_rect(topleft=pos).union(digits_rect)
+
+    def draw_lives(self, surface, lives, heart_image_index, pos=(10, 10), spacing=40):
+        heart = self.heart_images[int(heart_image_index)]
+        for i in range(lives):
+            surface.blit(heart, (pos[0] + i * spacing, pos[1]))
+
+    # Height of the strip at the top of the screen that draw() covers
+    def height(self):
+        return max(10 + max(image.get_height() for image in self.heart_images), 15 + self.digits.height)
+
+    def draw(self, surface, player, heart_image_index):
+        self.draw_lives(surface, player.lives, heart_image_index)
+        self.draw_counter(surface, 'Score: ', player.score, (190, 15))
@@ -1,24 +1,96 @@
+import time
+PROCESS_START = time.perf_counter()
+
+import argparse
 import pygame
-from menu import show_menu
-from gameplay import run_game
+from scenes import SceneManager, lazy_scene
+from menu import MenuScene
 import config  # import the config module
 
-def main():
-    pygame.init()
-    screen = pygame.display.set_mode((800, 500))
-    pygame.display.set_caption('Bird-Shooter')
+# Only the menu is imported up front; every other screen is imported the first time it opens
+def register_scenes(manager):
+    manager.register('menu', MenuScene)
+    manager.register('settings', lazy_scene('settings', 'SettingsScene'))
+    manager.register('tutorial', lazy_scene('gameplay', 'TutorialScene'))
+    manager.register('gameplay', lazy_scene('gameplay', 'GameplayScene'))
+    manager.register('gameplay_settings', lazy_scene('gameplaySettings', 'GameplaySettingsScene'))
+    manager.register('game_over', lazy_scene('gameOver', 'GameOverScreen'))
+    return manager
 
-    pygame.mixer.init()
-    pygame.mixer.music.load("audio/background_music.mp3")
-    pygame.mixer.music.set_volume(0.5)
+def start_music():
+    config.global_music.set_volume(0.5)
 
     # Use config.audio_enabled to control music playback
     if config.audio_enabled:
-        pygame.mixer.music.play(-1)  # Loop indefinitely
+        config.global_music.play('background')  # Loop indefinitely
+
+# gameplay: arguments for the gameplay screen (a replay or a state to start from) to go
+# straight into it instead of opening the menu
+def main(startup_report=False, gameplay=None):
+    from startup_report import StartupTimer
+    timer = StartupTimer(PROCESS_START)
+    timer.mark('imports')
+
+    # Audio is started after the menu is on screen, so only video and fonts come up here
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((800, 500))
+    pygame.display.set_caption('Bird-Shooter')
+    timer.mark('display')
+
+    manager = register_scenes(SceneManager(screen))
+
+    def after_first_frame():
+        timer.mark('menu on screen')
+        if config.init_audio():
+            start_music()
+        timer.mark('audio + music')
+        # Gameplay assets decode in the background while the menu is up
+        from preloader import global_preloader
+        from gameplay import preload_assets
+        preload_assets(global_preloader, screen.get_size())
+        global_preloader.start()
+        timer.mark('preload queued')
+        if startup_report:
+            global_preloader.wait()
+            timer.mark('preload finished')
+            manager.quit()
+
+    manager.defer(after_first_frame)
+
+    # Every screen runs inside this one loop; screens push, pop or replace each other
+    if gameplay:
+        config.init_audio()
+        manager.run('gameplay', **gameplay)
     else:
-        pygame.mixer.music.pause()
+        manager.run('menu')
+    pygame.quit()
 
-    show_menu(screen, start_callback=run_game)
+    if startup_report:
+        from startup_report import import_times, print_report
+        print_report(timer, import_times('main'))
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description='Bird-Shooter')
+    parser.add_argument('--startup-report', action='store_true', help='print where startup time goes, then exit')
+    parser.add_argument('--record', metavar='PATH', help='record every game played to this file')
+    parser.add_argument('--replay', metavar='PATH', help='watch a recording instead of playing')
+    parser.add_argument('--game', type=int, default=1, help='which game of the recording to watch (default: 1)')
+    parser.add_argument('--speed', type=int, default=1, help='replay this many times faster')
+    parser.add_argument('--skip-to', type=int, default=0, metavar='TICK', help='fast-forward the replay to this tick')
+    parser.add_argument('--state', metavar='PATH', help='play from a saved game state (see scenario.py)')
+    parser.add_argument('--backend', choices=('sprites', 'numpy'), default='sprites', help='engine entity backend (numpy needs NumPy)')
+    args = parser.parse_args()
+    config.record_path = args.record
+    config.engine_backend = args.backend
+    gameplay = None
+    if args.replay:
+        from replay import read_recordings
+        games = len(read_recordings(args.replay))
+        if not 1 <= args.game <= games:
+            print(f"{args.replay} holds {games} game(s); --game must be between 1 and {games}")
+            raise SystemExit(1)
+        gameplay = {'replay': args.replay, 'game': args.game - 1, 'speed': args.speed, 'skip_to': args.skip_to}
+    elif args.state:
+        gameplay = {'state': args.state}
+    main(startup_report=args.startup_report, gameplay=gameplay)
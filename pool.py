@@ -0,0 +1,76 @@
+import pygame
+
+# Object pools for short-lived sprites. A pooled sprite returns itself to its pool
+# when it is killed, and the next acquire() re-initialises it in place through
+# reset() instead of allocating a new object.
+
+
+class PooledSprite(pygame.sprite.Sprite):
+    def __init__(self):
+        super().__init__()
+        self.pool = None
+        self.in_use = False
+
+    def kill(self):
+        super().kill()
+        # kill() can run more than once per life (e.g. off screen and hit in the same tick)
+        if self.in_use:
+            self.in_use = False
+            if self.pool is not None:
+                self.pool.release(self)
+
+
+class SpritePool:
+    def __init__(self, cls, cap=64):
+        self.cls = cls
+        self.cap = cap
+        self.free = []
+        self.created = 0
+        self.reused = 0
+        self.dropped = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+
+    def acquire(self, *args):
+        if self.free:
+            sprite = self.free.pop()
+            sprite.reset(*args)
+            self.reused += 1
+        else:
+            sprite = self.cls(*args)
+            self.created += 1
+        sprite.pool = self
+        sprite.in_use = True
+        self.in_use += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+        return sprite
+
+    def release(self, sprite):
+        self.in_use -= 1
+        if len(self.free) < self.cap:
+            self.free.append(sprite)
+        else:
+            self.dropped += 1
+
+    def prefill(self, count, *args):
+        while len(self.free) < min(count, self.cap):
+            sprite = self.cls(*args)
+            self.created += 1
+            self.free.append(sprite)
+
+    def stats(self):
+        return {
+            'in_use': self.in_use,
+            'free': len(self.free),
+            'cap': self.cap,
+            'created': self.created,
+            'reused': self.reused,
+            'dropped': self.dropped,
+            'peak_in_use': self.peak_in_use,
+        }
+
+
+# Remove every sprite from a group through kill() so pooled sprites go back to their pool
+def release_all(group):
+    for sprite in group.sprites():
+        sprite.kill()
@@ -0,0 +1,128 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from assets import global_asset_manager
+from sprite_cache import global_animation_cache, load_gif_frames
+from config import global_sound_manager, global_music
+from sound_cache import global_pcm_cache
+
+# Background asset loading. Images, GIF animations, sounds and music are queued in named
+# groups and decoded on a thread pool while the menu is already running. Workers only
+# decode; poll() runs on the main thread, converts finished images to the display
+# format and puts everything into the shared caches. A scene that needs a group before
+# it has finished calls wait(), which blocks only for what is still outstanding.
+
+
+class AssetPreloader:
+    def __init__(self, assets=global_asset_manager, animations=global_animation_cache, sounds=global_sound_manager, music=global_music, max_workers=None):
+        self.assets = assets
+        self.animations = animations
+        self.sounds = sounds
+        self.music = music
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.executor = None
+        self.queued = []
+        self.pending = []
+        self.totals = {}
+        self.done = {}
+        self.started_at = None
+        self.finished_at = None
+
+    def add_image(self, group, path, **kwargs):
+        key = self.assets.key(path, **kwargs)
+        self._queue(group, self.assets.load, (key,), lambda surface: self.assets.store(key, surface))
+
+    def add_animation(self, group, path, size):
+        self._queue(group, load_gif_frames, (path, size), lambda frames: self.animations.store(path, size, frames))
+
+    def add_sound(self, group, name):
+        self._queue(group, self.sounds.decode, (name,), lambda sound: self.sounds.store(name, sound))
+
+    def add_music(self, group, name):
+        self._queue(group, global_pcm_cache.load, (self.music.track_paths[name],), lambda track: self.music.tracks.setdefault(name, track))
+
+    def _queue(self, group, decode, args, store):
+        self.totals[group] = self.totals.get(group, 0) + 1
+        self.done.setdefault(group, 0)
+        job = [group, decode, args, store, None]
+        if self.executor is None:
+            self.queued.append(job)
+        else:
+            self._submit(job)
+
+    def _submit(self, job):
+        job[4] = self.executor.submit(job[1], *job[2])
+        self.pending.append(job)
+
+    def start(self):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='preload')
+            self.started_at = time.perf_counter()
+            self.finished_at = None
+        for job in self.queued:
+            self._submit(job)
+        self.queued = []
+
+    # Store every finished job; call once per frame from the main thread
+    def poll(self):
+        if not self.pending:
+            return
+        still_pending = []
+        for job in self.pending:
+            if job[4].done():
+                self._finish(job)
+            else:
+                still_pending.append(job)
+        self.pending = still_pending
+        self._check_finished()
+
+    def wait(self, group=None):
+        if self.queued:
+            self.start()
+        still_pending = []
+        for job in self.pending:
+            if group is None or job[0] == group:
+                self._finish(job)
+            else:
+                still_pending.append(job)
+        self.pending = still_pending
+        self._check_finished()
+
+    def _finish(self, job):
+        group, decode, args, store, future = job
+        try:
+            store(future.result())
+        except Exception as e:
+            # leave the asset to be loaded (and report its error) on first use
+            print(f"Preloading {args[0]} failed: {e}")
+        self.done[group] += 1
+
+    def _check_finished(self):
+        if not self.pending and not self.queued and self.finished_at is None and self.started_at is not None:
+            self.finished_at = time.perf_counter()
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    def is_done(self, group=None):
+        return self.progress(group) >= 1.0
+
+    def progress(self, group=None):
+        groups = [group] if group is not None else list(self.totals)
+        total = sum(self.totals.get(g, 0) for g in groups)
+        if not total:
+            return 1.0
+        return sum(self.done.get(g, 0) for g in groups) / total
+
+    def stats(self):
+        elapsed = None
+        if self.started_at is not None and self.finished_at is not None:
+            elapsed = (self.finished_at - self.started_at) * 1000
+        return {
+            'groups': {group: (self.done[group], total) for group, total in self.totals.items()},
+            'workers': self.max_workers,
+            'elapsed_ms': elapsed,
+        }
+
+
+# Shared preloader
+global_preloader = AssetPreloader()
@@ -0,0 +1,218 @@
+import argparse
+import struct
+import sys
+import time
+
+from engine import GameEngine, STATE_VERSION
+
+# Session recordings. A recording holds one or more games. Each game is its seed
+# followed by the input bitmask of every simulation tick, run-length encoded, so a
+# session costs a few bytes per input change. Games are written while they are played
+# and the reader stops cleanly at a truncated tail, so the recording of a crashed
+# session still replays up to the crash. A game's outcome depends only on its seed,
+# its inputs and the rules the engine runs (engine version and wave table), so
+# replaying it under the same rules re-simulates it exactly. The rules are written into
+# each game's header, and replaying under other rules is refused with an error instead
+# of being reported as a divergence.
+#
+#   python main.py --record session.bsr                       record every game played
+#   python replay.py session.bsr                              re-simulate headless at full speed
+#   python main.py --replay session.bsr --speed 4 --skip-to 7200   watch it in the window
+#
+# Layout, little-endian:
+#   game header  '<4sBBIHH8s'  magic b'BSRG', version, flags, seed, tick rate,
+#                engine STATE_VERSION, digest of the wave table
+#   input run    1 byte bitmask (< 0x80) + varint number of ticks it was held
+#   game end     0xFF + varint ticks + varint score + 1 byte game over
+
+GAME_HEADER = struct.Struct('<4sBBIHH8s')
+GAME_MAGIC = b'BSRG'
+VERSION = 2
+END_MARK = 0xFF
+
+# Recorded next to the engine's ACTION_* bits; the engine ignores it
+INPUT_SETTINGS = 8
+
+# Game flags
+FLAG_PIXEL_PERFECT = 1
+
+
+def encode_varint(value):
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+# (value, next position); raises IndexError on a truncated varint
+def decode_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class InputRecorder:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.recording = False
+        self.games = 0
+        self.run_inputs = None
+        self.run_length = 0
+        self.pending = 0
+
+    # Begin a new game; call right after engine.reset(). After close() the file is
+    # reopened and the game appended, so a session still ends up in one recording
+    def start(self, engine, flags=0):
+        self.end(engine)
+        if self.file.closed:
+            self.file = open(self.path, 'ab')
+        self.file.write(GAME_HEADER.pack(GAME_MAGIC, VERSION, flags, engine.seed, engine.tick_rate, STATE_VERSION, engine.waves.digest))
+        self.recording = True
+        self.games += 1
+        self.run_inputs = None
+        self.run_length = 0
+        self.pending = 0
+
+    # Extra bits (e.g. INPUT_SETTINGS) folded into the next recorded tick
+    def mark(self, bits):
+        self.pending |= bits
+
+    def record(self, inputs):
+        inputs |= self.pending
+        self.pending = 0
+        if inputs == self.run_inputs:
+            self.run_length += 1
+        else:
+            self._write_run()
+            self.run_inputs = inputs
+            self.run_length = 1
+
+    # Finish the current game with the engine's final state, which replays verify against
+    def end(self, engine):
+        if not self.recording:
+            return
+        self._write_run()
+        self.file.write(bytes([END_MARK]) + encode_varint(engine.ticks) + encode_varint(engine.player.score) + bytes([engine.game_over]))
+        self.file.flush()
+        self.recording = False
+
+    def close(self):
+        self.file.close()
+
+    def _write_run(self):
+        if self.run_length:
+            self.file.write(bytes([self.run_inputs]) + encode_varint(self.run_length))
+            # flushed per input change, so a crash loses at most the input being held
+            self.file.flush()
+        self.run_length = 0
+
+
+class Recording:
+    def __init__(self, seed, flags, tick_rate, engine_version, waves_digest):
+        self.seed = seed
+        self.flags = flags
+        self.tick_rate = tick_rate
+        self.engine_version = engine_version
+        self.waves_digest = waves_digest
+        self.runs = []
+        self.end = None  # (ticks, score, game_over), None if the session was cut short
+
+    @property
+    def ticks(self):
+        return sum(length for _, length in self.runs)
+
+    # The input bitmask of every tick, in order
+    def inputs(self):
+        for inputs, length in self.runs:
+            for _ in range(length):
+                yield inputs
+
+
+def read_recordings(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    recordings = []
+    pos = 0
+    recording = None
+    try:
+        while pos < len(data):
+            if recording is None:
+                magic, version, flags, seed, tick_rate, engine_version, waves_digest = GAME_HEADER.unpack_from(data, pos)
+                if magic != GAME_MAGIC or version != VERSION:
+                    print(f"{path}: not a version {VERSION} recording at byte {pos}")
+                    break
+                pos += GAME_HEADER.size
+                recording = Recording(seed, flags, tick_rate, engine_version, waves_digest)
+                recordings.append(recording)
+            elif data[pos] == END_MARK:
+                ticks, pos = decode_varint(data, pos + 1)
+                score, pos = decode_varint(data, pos)
+                game_over = bool(data[pos])
+                pos += 1
+                recording.end = (ticks, score, game_over)
+                recording = None
+            else:
+                inputs = data[pos]
+                length, pos = decode_varint(data, pos + 1)
+                recording.runs.append((inputs, length))
+    except (IndexError, struct.error):
+        print(f"{path}: recording is truncated at byte {pos}, replaying what was written")
+    return recordings
+
+
+# Raise ValueError if engine does not run the rules the game was recorded with
+def check_rules(recording, engine):
+    if recording.engine_version != STATE_VERSION:
+        raise ValueError(f"Recorded with engine version {recording.engine_version}, this engine is version {STATE_VERSION}")
+    if recording.waves_digest != engine.waves.digest:
+        raise ValueError(f"Recorded with wave table {recording.waves_digest.hex()}, this engine uses {engine.waves.digest.hex()} "
+                         "(waves.json has changed since)")
+
+
+# Re-simulate a whole game on engine; returns True when it ends exactly as recorded
+def replay(recording, engine):
+    check_rules(recording, engine)
+    engine.reset(recording.seed)
+    for inputs in recording.inputs():
+        engine.step(inputs)
+    if recording.end is None:
+        return True
+    return (engine.ticks, engine.player.score, engine.game_over) == recording.end
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Re-simulate recorded games headless at full speed.')
+    parser.add_argument('path')
+    args = parser.parse_args(argv)
+
+    mismatches = 0
+    for number, recording in enumerate(read_recordings(args.path), 1):
+        if recording.flags & FLAG_PIXEL_PERFECT:
+            print(f"game {number}: recorded with pixel-perfect collisions, which need the window; use main.py --replay")
+            continue
+        engine = GameEngine(tick_rate=recording.tick_rate)
+        start = time.perf_counter()
+        try:
+            matches = replay(recording, engine)
+        except ValueError as e:
+            print(f"game {number}: cannot be replayed: {e}")
+            mismatches += 1
+            continue
+        elapsed = time.perf_counter() - start
+        mismatches += not matches
+        status = 'cut short' if recording.end is None else 'matches' if matches else f'DIFFERS from recorded {recording.end}'
+        print(f"game {number}: seed {recording.seed}, {engine.ticks} ticks ({engine.time / 1000:.1f}s) in {elapsed:.2f}s, "
+              f"score {engine.player.score}, level {engine.difficulty_level}, {status}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import argparse
+import json
+import sys
+
+from engine import GameEngine, BIRD_COLORS
+
+# Game states built directly instead of played up to, for profiling and debugging a
+# particular situation:
+#
+#   python scenario.py --level 5 --birds 40 --out level5.json        write the state
+#   python scenario.py --level 5 --birds 40 --profile 1200           profile 1200 ticks from it
+#   python main.py --state level5.json                               play from it
+
+
+# Reset engine, raise it to `level` (the score that reaches it included) and scatter
+# the requested entities over the right-hand part of the screen. Returns the snapshot.
+def build_scenario(engine, level=0, birds=0, clouds=0, hearts=0, lives=3, seed=None):
+    engine.reset(seed)
+    rng = engine.rng
+    player = engine.player
+    # the score the wave table needs for this level, so the first tick does not promote it
+    player.score = engine.waves.level(level).score
+    player.lives = lives
+    engine.set_level(level)
+
+    left = player.rect.right + 100
+    for _ in range(birds):
+        color = rng.choice(BIRD_COLORS)
+        engine.add_bird(rng.randint(left, engine.width), engine.random_y(), color, engine.bird_speed)
+    cloud_speed = engine.cloud_speed()
+    for _ in range(clouds):
+        engine.add_cloud(rng.randint(left, engine.width), engine.random_y(), cloud_speed)
+    for _ in range(hearts):
+        engine.add_heart(rng.randint(left, engine.width), engine.random_y())
+    return engine.snapshot()
+
+
+def save_state(path, state):
+    with open(path, 'w') as f:
+        json.dump(state, f)
+
+
+def load_state(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def profile(engine, ticks, top=15):
+    import cProfile
+    import pstats
+    from engine import ACTION_SHOOT
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for _ in range(ticks):
+        engine.step(ACTION_SHOOT)
+        # keep the player alive so the whole run is profiled
+        engine.player.lives = 3
+        engine.game_over = False
+    profiler.disable()
+    pstats.Stats(profiler).sort_stats('cumulative').print_stats(top)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build a game state without playing up to it.')
+    parser.add_argument('--level', type=int, default=0)
+    parser.add_argument('--birds', type=int, default=0)
+    parser.add_argument('--clouds', type=int, default=0)
+    parser.add_argument('--hearts', type=int, default=0)
+    parser.add_argument('--lives', type=int, default=3)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--out', help='write the state here as json')
+    parser.add_argument('--profile', type=int, metavar='TICKS', help='profile this many headless ticks from the state, with the player kept alive')
+    args = parser.parse_args(argv)
+
+    engine = GameEngine()
+    state = build_scenario(engine, args.level, args.birds, args.clouds, args.hearts, args.lives, args.seed)
+    print(f"level {engine.difficulty_level}, score {engine.player.score}, {engine.count('bird')} birds, "
+          f"{engine.count('cloud')} clouds, {engine.count('heart')} hearts, seed {engine.seed}")
+    if args.out:
+        save_state(args.out, state)
+        print(f"State written to {args.out}")
+    if args.profile:
+        profile(engine, args.profile)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+import importlib
+import pygame
+from screen_loop import present
+from transitions import Transitions
+
+# Scene stack with a single top-level loop. Every screen is a Scene registered under a
+# name; the manager creates each scene once and keeps it, so its images, fonts and
+# widgets stay loaded between visits. Only the scene on top of the stack receives
+# events and is updated and drawn; the scenes below it are paused, which for gameplay
+# means its simulation clock does not advance.
+#
+# While the top scene is not animating the loop blocks in pygame.event.wait() instead
+# of spinning, waking up every idle_timeout ms to pick up hover changes.
+
+
+class Scene:
+    fps = 60
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.screen = manager.screen
+        self.transitions = Transitions()
+
+    # pushed onto the stack (keyword arguments come from push()/replace())
+    def enter(self, **kwargs):
+        pass
+
+    # removed from the stack; unfinished transitions are dropped
+    def exit(self):
+        self.transitions.clear()
+
+    # another scene was pushed on top of this one
+    def pause(self):
+        pass
+
+    # the scene on top was popped; result is whatever it passed to pop()
+    def resume(self, result=None):
+        pass
+
+    # scenes keep running at full frame rate while a transition is in progress
+    def animating(self):
+        return self.transitions.active()
+
+    def handle_event(self, event):
+        pass
+
+    def update(self, frame_ms):
+        self.transitions.update(frame_ms)
+
+    # returns a list of dirty rects, or None to present the whole window
+    def draw(self):
+        return None
+
+
+# Scene drawn through a DirtyScreen. build_view() runs on the first visit; later
+# visits reuse the view and only repaint it in full.
+class StaticScene(Scene):
+    view = None
+
+    def build_view(self):
+        raise NotImplementedError
+
+    def enter(self, **kwargs):
+        if self.view is None:
+            self.view = self.build_view()
+        else:
+            self.view.invalidate()
+
+    def resume(self, result=None):
+        self.view.invalidate()
+
+    def draw(self):
+        return self.view.draw()
+
+
+# Factory that imports the scene's module the first time the scene is needed
+def lazy_scene(module_name, class_name):
+    def factory(manager):
+        return getattr(importlib.import_module(module_name), class_name)(manager)
+    return factory
+
+
+class SceneManager:
+    def __init__(self, screen, idle_timeout=250):
+        self.screen = screen
+        self.idle_timeout = idle_timeout
+        self.factories = {}
+        self.scenes = {}
+        self.stack = []
+        self.running = False
+        self.transitioned = False
+        self.deferred = []
+        self.clock = pygame.time.Clock()
+
+    def register(self, name, factory):
+        self.factories[name] = factory
+
+    def get(self, name):
+        scene = self.scenes.get(name)
+        if scene is None:
+            scene = self.scenes[name] = self.factories[name](self)
+        return scene
+
+    @property
+    def top(self):
+        return self.stack[-1] if self.stack else None
+
+    def push(self, name, **kwargs):
+        if self.stack:
+            self.stack[-1].pause()
+        self._enter(name, kwargs)
+
+    def pop(self, result=None):
+        self.stack.pop().exit()
+        self.transitioned = True
+        if self.stack:
+            self.stack[-1].resume(result)
+
+    def replace(self, name, **kwargs):
+        self.stack.pop().exit()
+        self._enter(name, kwargs)
+
+    # Pop every scene above the named one without resuming the ones in between
+    def pop_to(self, name, result=None):
+        target = self.get(name)
+        while self.stack and self.stack[-1] is not target:
+            self.stack.pop().exit()
+        self.transitioned = True
+        if self.stack:
+            target.resume(result)
+
+    def quit(self):
+        self.running = False
+
+    # Run callback once, right after the next frame is on screen
+    def defer(self, callback):
+        self.deferred.append(callback)
+
+    def _enter(self, name, kwargs):
+        scene = self.get(name)
+        self.stack.append(scene)
+        self.transitioned = True
+        scene.enter(**kwargs)
+
+    def run(self, name, **kwargs):
+        self.running = True
+        self.push(name, **kwargs)
+        self._present()
+        last_mouse_pos = pygame.mouse.get_pos()
+        redraw = False
+
+        while self.running and self.stack:
+            scene = self.stack[-1]
+            if scene.animating():
+                frame_ms = self.clock.tick(scene.fps)
+                events = pygame.event.get()
+                redraw = True
+            else:
+                event = pygame.event.wait(self.idle_timeout)
+                events = [] if event.type == pygame.NOEVENT else [event] + pygame.event.get()
+                frame_ms = self.clock.tick()
+                redraw = redraw or bool(events)
+
+            self.transitioned = False
+            for event in events:
+                if event.type == pygame.QUIT:
+                    self.quit()
+                    break
+                # events after a transition go to the new top scene
+                self.stack[-1].handle_event(event)
+                if not self.stack:
+                    break
+            if not self.running or not self.stack:
+                break
+
+            if self.transitioned:
+                # time spent before the switch belongs to the previous scene
+                self.clock.tick()
+                redraw = True
+            else:
+                scene.update(frame_ms)
+                if self.transitioned:
+                    self.clock.tick()
+                    redraw = True
+
+            mouse_pos = pygame.mouse.get_pos()
+            if redraw or mouse_pos != last_mouse_pos:
+                last_mouse_pos = mouse_pos
+                redraw = False
+                self._present()
+
+        while self.stack:
+            self.stack.pop().exit()
+
+    def _present(self):
+        present(self.stack[-1].draw())
+        if self.deferred:
+            callbacks, self.deferred = self.deferred, []
+            for callback in callbacks:
+                callback()
+            # the callbacks' time must not reach the next update
+            self.clock.tick()
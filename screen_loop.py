@@ -0,0 +1,53 @@
+import pygame
+
+# Presenting frames for the static screens. A scene's draw() returns either a list of
+# dirty rects to push or None to present the whole window.
+
+
+def present(dirty_rects):
+    if dirty_rects is None:
+        pygame.display.flip()
+    elif dirty_rects:
+        pygame.display.update(dirty_rects)
+
+
+# Dirty-rectangle drawing for static screens. Everything that never changes
+# (background, panel, titles) is composed once into a cached surface; each widget
+# region is redrawn only when its state changes, and only those rects are pushed.
+class DirtyScreen:
+    def __init__(self, screen, draw_static):
+        self.screen = screen
+        self.background = pygame.Surface(screen.get_size()).convert()
+        draw_static(self.background)
+        self.regions = []
+        self.full_redraw = True
+
+    def add(self, rect, state, draw):
+        self.regions.append([pygame.Rect(rect), state, draw, None])
+
+    def add_button(self, button):
+        self.add(button.rect, button.is_hovered, button.draw)
+
+    def invalidate(self):
+        # call after another screen has drawn over this one
+        self.full_redraw = True
+
+    def draw(self):
+        if self.full_redraw:
+            self.full_redraw = False
+            self.screen.blit(self.background, (0, 0))
+            for region in self.regions:
+                region[3] = region[1]()
+                region[2](self.screen)
+            return None
+
+        dirty = []
+        for region in self.regions:
+            rect, state, draw, last_state = region
+            current = state()
+            if current != last_state:
+                region[3] = current
+                self.screen.blit(self.background, rect, rect)
+                draw(self.screen)
+                dirty.append(rect)
+        return dirty
@@ -0,0 +1,73 @@
+import os
+import mmap
+import hashlib
+import struct
+import pygame
+
+from assets import write_atomic
+
+CACHE_VERSION = 1
+_HEADER = struct.Struct('<4sHiii')
+_MAGIC = b'BSPC'
+
+
+# Decoded sound cache. The first launch decodes each MP3 as usual and writes the raw
+# samples, already in the mixer's format, to disk; later launches memory-map that file
+# and hand the samples straight to pygame.mixer.Sound(buffer=...), skipping the MP3
+# decoder. Entries are keyed by file path, mtime, size and mixer format, so changing
+# a sound or the mixer settings just misses and re-decodes.
+class PCMCache:
+    def __init__(self, cache_dir=os.path.join('.asset_cache', 'pcm'), enabled=True):
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path):
+        mixer_format = pygame.mixer.get_init()
+        cache_path = self._cache_path(path, mixer_format)
+        sound = self._load_from_disk(cache_path, mixer_format) if cache_path else None
+        if sound is not None:
+            self.hits += 1
+            return sound
+        self.misses += 1
+        sound = pygame.mixer.Sound(path)
+        if cache_path:
+            self._save_to_disk(cache_path, sound, mixer_format)
+        return sound
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def _cache_path(self, path, mixer_format):
+        if not self.enabled or mixer_format is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        digest = hashlib.sha1(repr((CACHE_VERSION, path, stat.st_mtime_ns, stat.st_size, mixer_format)).encode()).hexdigest()
+        return os.path.join(self.cache_dir, digest + '.pcm')
+
+    def _load_from_disk(self, cache_path, mixer_format):
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with open(cache_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                magic, version, frequency, size, channels = _HEADER.unpack_from(data)
+                if magic != _MAGIC or version != CACHE_VERSION or (frequency, size, channels) != tuple(mixer_format):
+                    return None
+                with memoryview(data) as view:
+                    return pygame.mixer.Sound(buffer=view[_HEADER.size:])
+        except (OSError, ValueError, struct.error, pygame.error):
+            return None
+
+    def _save_to_disk(self, cache_path, sound, mixer_format):
+        try:
+            write_atomic(cache_path, _HEADER.pack(_MAGIC, CACHE_VERSION, *mixer_format), sound.get_raw())
+        except OSError as e:
+            print(f"Could not write sound cache for {cache_path}: {e}")
+
+
+# Shared PCM cache
+global_pcm_cache = PCMCache()
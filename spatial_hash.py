@@ -0,0 +1,71 @@
+from collections import defaultdict
+
+# Uniform-grid broad phase. Sprites are bucketed by the grid cells their rect covers,
+# so a query only looks at sprites in nearby cells instead of scanning a whole group.
+# Results keep insertion order, which makes them match pygame.sprite.spritecollide.
+
+
+class SpatialHash:
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+        self.count = 0
+
+    def clear(self):
+        self.cells.clear()
+        self.count = 0
+
+    def cell_range(self, rect):
+        size = self.cell_size
+        return range(rect.left // size, (rect.right - 1) // size + 1), range(rect.top // size, (rect.bottom - 1) // size + 1)
+
+    def insert(self, sprite):
+        entry = (self.count, sprite)
+        self.count += 1
+        xs, ys = self.cell_range(sprite.rect)
+        for cx in xs:
+            for cy in ys:
+                self.cells[(cx, cy)].append(entry)
+
+    def build(self, sprites):
+        self.clear()
+        for sprite in sprites:
+            self.insert(sprite)
+        return self
+
+    def query(self, rect):
+        found = {}
+        cells = self.cells
+        xs, ys = self.cell_range(rect)
+        for cx in xs:
+            for cy in ys:
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    for index, sprite in bucket:
+                        found[index] = sprite
+        return [found[index] for index in sorted(found)]
+
+    # Sprites whose rect overlaps `rect`, with an optional narrow-phase test
+    def colliding(self, sprite, narrow_phase=None):
+        rect = sprite.rect
+        hits = [other for other in self.query(rect) if other.alive() and rect.colliderect(other.rect)]
+        if narrow_phase is not None:
+            hits = [other for other in hits if narrow_phase(sprite, other)]
+        return hits
+
+    def pairs(self, sprites, narrow_phase=None):
+        for sprite in sprites:
+            for other in self.colliding(sprite, narrow_phase):
+                yield sprite, other
+
+
+# Pixel-accurate narrow phase. mask_of(sprite) returns a pygame.mask.Mask matching the
+# sprite's rect, or None to accept the rect overlap as a hit.
+def mask_narrow_phase(mask_of):
+    def overlaps(a, b):
+        mask_a, mask_b = mask_of(a), mask_of(b)
+        if mask_a is None or mask_b is None:
+            return True
+        offset = (b.rect.x - a.rect.x, b.rect.y - a.rect.y)
+        return mask_a.overlap(mask_b, offset) is not None
+    return overlaps
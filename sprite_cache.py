@@ -0,0 +1,88 @@
+import pygame
+
+# Decodes each animated asset once per process and hands out the same frame list
+# to every sprite that asks for it. Sprites only keep their own frame index.
+class AnimationCache:
+    def __init__(self):
+        self.frames = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_frames(self, path, size):
+        key = (path, tuple(size))
+        frames = self.frames.get(key)
+        if frames is not None:
+            self.hits += 1
+            return frames
+        self.misses += 1
+        frames = load_gif_frames(path, size)
+        self.frames[key] = frames
+        return frames
+
+    # Frames decoded elsewhere (e.g. on a preload worker)
+    def store(self, path, size, frames):
+        self.frames[(path, tuple(size))] = tuple(frames)
+
+    def stats(self):
+        return {'entries': len(self.frames), 'hits': self.hits, 'misses': self.misses}
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self.frames.clear()
+        self.reset_stats()
+
+
+# Every (frame, angle) combination a sprite can show, rotated once at load time.
+# Angles that were not listed up front are rotated on first use and kept.
+class RotationTable:
+    def __init__(self, frames, angles, with_masks=False):
+        self.frames = tuple(frames)
+        self.with_masks = with_masks
+        self.surfaces = {}
+        self.masks = {}
+        for index in range(len(self.frames)):
+            for angle in angles:
+                self._build(index, angle)
+
+    def _build(self, index, angle):
+        key = (index, angle)
+        surface = self.frames[index] if angle % 360 == 0 else pygame.transform.rotate(self.frames[index], angle)
+        self.surfaces[key] = surface
+        if self.with_masks:
+            self.masks[key] = pygame.mask.from_surface(surface)
+        return surface
+
+    def get(self, index, angle):
+        surface = self.surfaces.get((index, angle))
+        return surface if surface is not None else self._build(index, angle)
+
+    def mask(self, index, angle):
+        if (index, angle) not in self.masks:
+            self.with_masks = True
+            self._build(index, angle)
+        return self.masks[(index, angle)]
+
+    def size(self, angle, index=0):
+        return self.get(index, angle).get_size()
+
+
+def load_gif_frames(path, size):
+    # PIL is only needed for GIFs, so it is imported on first use rather than at startup
+    from PIL import Image
+    pil_gif, frames = Image.open(path), []
+    try:
+        while True:
+            frame = pil_gif.convert('RGBA')
+            pygame_image = pygame.image.fromstring(frame.tobytes(), frame.size, frame.mode)
+            frames.append(pygame.transform.scale(pygame_image, size))
+            pil_gif.seek(pil_gif.tell() + 1)
+    except EOFError:
+        pass
+    return tuple(frames)
+
+
+# Shared animation cache
+global_animation_cache = AnimationCache()
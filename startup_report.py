@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+import time
+
+# Startup-time report for `python main.py --startup-report`: wall-clock time of each
+# launcher phase, plus an import-time breakdown taken from a `python -X importtime`
+# run of the launcher's imports in a fresh interpreter.
+
+
+class StartupTimer:
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.last = self.start
+        self.phases = []
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, (now - self.last) * 1000, (now - self.start) * 1000))
+        self.last = now
+
+
+# (module, self ms, cumulative ms, depth) for every import made by `import module`
+def import_times(module='main'):
+    env = dict(os.environ, SDL_VIDEODRIVER=os.environ.get('SDL_VIDEODRIVER', 'dummy'))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.abspath(__file__)))
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        if not self_us.strip().isdigit():
+            continue  # column header
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000, depth))
+    return rows
+
+
+def print_report(timer, imports, module='main', top=10):
+    print(f"{'phase':<28}{'ms':>10}{'since start':>14}")
+    for name, duration, elapsed in timer.phases:
+        print(f"{name:<28}{duration:>10.1f}{elapsed:>14.1f}")
+
+    roots = [i for i, row in enumerate(imports) if row[0] == module and row[3] == 0]
+    if not roots:
+        return
+    root = imports[roots[0]]
+    children = []
+    # -X importtime lists a module after everything it imported
+    for row in reversed(imports[:roots[0]]):
+        if row[3] == root[3]:
+            break
+        if row[3] == root[3] + 1:
+            children.append(row)
+    print(f"\nimport {root[0]}: {root[2]:.1f} ms")
+    print(f"{'direct import':<28}{'cumulative ms':>14}")
+    for name, _, cumulative, _ in sorted(children, key=lambda row: -row[2]):
+        print(f"{name:<28}{cumulative:>14.1f}")
+    print(f"\n{'slowest modules (self)':<40}{'self ms':>10}")
+    for name, self_ms, _, _ in sorted(imports, key=lambda row: -row[1])[:top]:
+        print(f"{name:<40}{self_ms:>10.1f}")
@@ -0,0 +1,84 @@
+import random
+
+from engine import GameEngine, ACTION_SHOOT
+from batch_runner import scripted_policy
+from scenario import build_scenario
+
+# The sprite and NumPy entity backends must play the same game: for a fixed seed and
+# input sequence every tick has to produce the same events, score and lives.
+#
+#   python -m pytest -q test_backends.py
+
+
+def play(engine, inputs):
+    ticks = []
+    for actions in inputs:
+        if engine.game_over:
+            break
+        events = engine.step(actions)
+        ticks.append((events, engine.player.score, engine.player.lives, engine.count('bird'), engine.count('cloud')))
+    return ticks
+
+
+def engines(seed):
+    sprites, arrays = GameEngine(backend='sprites'), GameEngine(backend='numpy')
+    sprites.reset(seed)
+    arrays.reset(seed)
+    return sprites, arrays
+
+
+def test_random_inputs():
+    for seed in (1, 2, 3):
+        rng = random.Random(seed)
+        inputs = [rng.randrange(8) for _ in range(20000)]
+        sprites, arrays = engines(seed)
+        assert play(sprites, inputs) == play(arrays, inputs)
+        assert (sprites.player.score, sprites.player.lives, sprites.ticks) == (arrays.player.score, arrays.player.lives, arrays.ticks)
+
+
+def test_scripted_policy():
+    for seed in range(5):
+        sprites, arrays = engines(seed)
+        sprites_rng, arrays_rng = random.Random(seed), random.Random(seed)
+        while not sprites.game_over and sprites.ticks < 120 * 300:
+            sprites_events = sprites.step(scripted_policy(sprites, sprites_rng))
+            assert arrays.step(scripted_policy(arrays, arrays_rng)) == sprites_events
+            assert (arrays.player.score, arrays.player.lives) == (sprites.player.score, sprites.player.lives)
+        assert arrays.game_over == sprites.game_over
+
+
+# A crowded late level, with the player kept alive so every kind of hit keeps happening
+def test_crowded_scenario():
+    sprites, arrays = GameEngine(backend='sprites'), GameEngine(backend='numpy')
+    for engine in (sprites, arrays):
+        build_scenario(engine, level=8, birds=60, clouds=8, hearts=3, lives=2, seed=11)
+    for tick in range(3000):
+        actions = ACTION_SHOOT | (tick // 90) % 3
+        assert arrays.step(actions) == sprites.step(actions)
+        assert (arrays.player.score, arrays.player.lives) == (sprites.player.score, sprites.player.lives)
+        for engine in (sprites, arrays):
+            engine.player.lives, engine.game_over = 3, False
+    assert sprites.player.score > 0
+
+
+# States move between backends through snapshot()/restore()
+def test_snapshot_across_backends():
+    sprites, arrays = engines(4)
+    rng = random.Random(4)
+    play(sprites, [ACTION_SHOOT | rng.randrange(3) for _ in range(3000)])
+    arrays.restore(sprites.snapshot())
+    assert arrays.snapshot()['birds'] == sprites.snapshot()['birds']
+    inputs = [ACTION_SHOOT | rng.randrange(3) for _ in range(6000)]
+    assert play(sprites, inputs) == play(arrays, inputs)
+
+
+# Bullets that leave the screen on a tick can still hit a bird on that tick
+def test_bullet_leaving_screen_hits():
+    for backend in ('sprites', 'numpy'):
+        engine = GameEngine(backend=backend)
+        engine.reset(5)
+        engine.add_bullet(engine.width - 2, 100)
+        engine.add_bird(engine.width - 10, 100, 'blue', 2)
+        hits = [(event.x, event.y) for event in engine.step() if event.kind == 'hit_bird']
+        assert hits == [(engine.width + 12, 110)], backend
+        assert (engine.player.score, engine.count('bullet'), engine.count('bird')) == (1, 0, 0), backend
@@ -0,0 +1,64 @@
+import pygame
+
+# Text effects baked into a single cached surface, so an outlined, shadowed or glowing
+# title costs one blit per frame instead of one render per outline pass. The cache is
+# shared by every screen. Outline and glow pad the text evenly on all sides, so a
+# rect centred on the baked surface lines up with the plain text.
+
+_cache = {}
+
+
+def _cached(key, build):
+    surface = _cache.get(key)
+    if surface is None:
+        surface = _cache[key] = build()
+    return surface
+
+
+def render_text(font, text, color):
+    return _cached((id(font), text, color), lambda: font.render(text, True, color))
+
+
+def render_outlined(font, text, color, outline_color=(0, 0, 0), thickness=2):
+    def build():
+        main = font.render(text, True, color)
+        outline = font.render(text, True, outline_color)
+        surface = pygame.Surface((main.get_width() + thickness * 2, main.get_height() + thickness * 2), pygame.SRCALPHA)
+        for dx in (-thickness, 0, thickness):
+            for dy in (-thickness, 0, thickness):
+                if dx or dy:
+                    surface.blit(outline, (thickness + dx, thickness + dy))
+        surface.blit(main, (thickness, thickness))
+        return surface
+    return _cached((id(font), text, color, 'outline', outline_color, thickness), build)
+
+
+# The shadow extends the surface by offset to the bottom right
+def render_shadowed(font, text, color, shadow_color=(0, 0, 0), offset=(3, 3)):
+    def build():
+        main = font.render(text, True, color)
+        shadow = font.render(text, True, shadow_color)
+        surface = pygame.Surface((main.get_width() + abs(offset[0]), main.get_height() + abs(offset[1])), pygame.SRCALPHA)
+        surface.blit(shadow, (max(offset[0], 0), max(offset[1], 0)))
+        surface.blit(main, (max(-offset[0], 0), max(-offset[1], 0)))
+        return surface
+    return _cached((id(font), text, color, 'shadow', shadow_color, tuple(offset)), build)
+
+
+def render_glow(font, text, color, glow_color=(255, 255, 255), radius=4, strength=60):
+    def build():
+        main = font.render(text, True, color)
+        glow = font.render(text, True, glow_color)
+        glow.set_alpha(strength)
+        surface = pygame.Surface((main.get_width() + radius * 2, main.get_height() + radius * 2), pygame.SRCALPHA)
+        for dx in range(-radius, radius + 1):
+            for dy in range(-radius, radius + 1):
+                if dx * dx + dy * dy <= radius * radius:
+                    surface.blit(glow, (radius + dx, radius + dy))
+        surface.blit(main, (radius, radius))
+        return surface
+    return _cached((id(font), text, color, 'glow', glow_color, radius, strength), build)
+
+
+def clear_cache():
+    _cache.clear()
@@ -0,0 +1,59 @@
+# Fixed-timestep clock: the simulation always advances in steps of 1/tick_rate seconds,
+# no matter how fast frames are rendered. Leftover frame time is kept in the
+# accumulator and exposed as `alpha` so drawing can interpolate between two ticks.
+class FixedTimestep:
+    def __init__(self, tick_rate=120, max_steps_per_frame=8):
+        self.tick_rate = tick_rate
+        self.step_ms = 1000 / tick_rate
+        self.max_steps_per_frame = max_steps_per_frame
+        self.accumulator = 0.0
+        self.ticks = 0
+
+    @property
+    def time(self):
+        # simulated milliseconds since reset, used instead of pygame.time.get_ticks()
+        return self.ticks * self.step_ms
+
+    @property
+    def alpha(self):
+        return self.accumulator / self.step_ms
+
+    def advance(self, frame_ms):
+        # Under a load spike drop the backlog instead of trying to catch up forever
+        self.accumulator = min(self.accumulator + frame_ms, self.step_ms * self.max_steps_per_frame)
+        steps = 0
+        while self.accumulator >= self.step_ms:
+            self.accumulator -= self.step_ms
+            steps += 1
+        return steps
+
+    def step(self):
+        self.ticks += 1
+
+    def discard_pending(self):
+        # call when a paused scene resumes so the time spent paused is not simulated
+        self.accumulator = 0.0
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.ticks = 0
+
+
+def remember_positions(*groups):
+    for group in groups:
+        for sprite in group:
+            sprite.prev_pos = sprite.rect.topleft
+
+
+# (image, position) for every sprite of a group, ready for Surface.blits()
+def interpolated_blits(group, alpha, image_of=None):
+    for sprite in group:
+        image = image_of(sprite) if image_of else sprite.image
+        prev_pos = getattr(sprite, 'prev_pos', None)
+        if prev_pos is None:
+            yield image, sprite.rect.topleft
+        else:
+            x = prev_pos[0] + (sprite.rect.x - prev_pos[0]) * alpha
+            y = prev_pos[1] + (sprite.rect.y - prev_pos[1]) * alpha
+            yield image, (round(x), round(y))
+
@@ -0,0 +1,63 @@
+# Timed effects (fades, delayed actions, music changes) that advance on the frame clock
+# instead of blocking. A scene adds effects to its Transitions and keeps animating
+# while any are running, so events keep being pumped and frames keep being drawn.
+
+
+class Tween:
+    def __init__(self, duration_ms, on_update=None, on_done=None, delay_ms=0):
+        self.duration_ms = duration_ms
+        self.on_update = on_update
+        self.on_done = on_done
+        self.delay_ms = delay_ms
+        self.elapsed_ms = 0
+        self.finished = False
+
+    # progress 0..1 after the delay
+    @property
+    def t(self):
+        if self.duration_ms <= 0:
+            return 1.0 if self.elapsed_ms >= self.delay_ms else 0.0
+        return min(max((self.elapsed_ms - self.delay_ms) / self.duration_ms, 0.0), 1.0)
+
+    def advance(self, frame_ms):
+        if self.finished:
+            return True
+        self.elapsed_ms += frame_ms
+        if self.elapsed_ms < self.delay_ms:
+            return False
+        t = self.t
+        if self.on_update:
+            self.on_update(t)
+        if t >= 1.0:
+            self.finished = True
+            if self.on_done:
+                self.on_done()
+        return self.finished
+
+
+class Transitions:
+    def __init__(self):
+        self.effects = []
+
+    def add(self, effect):
+        self.effects.append(effect)
+        return effect
+
+    def tween(self, duration_ms, on_update=None, on_done=None, delay_ms=0):
+        return self.add(Tween(duration_ms, on_update, on_done, delay_ms))
+
+    def after(self, delay_ms, callback):
+        return self.add(Tween(0, on_done=callback, delay_ms=delay_ms))
+
+    def update(self, frame_ms):
+        if self.effects:
+            # effects may add new effects from their callbacks
+            effects, self.effects = self.effects, []
+            still_running = [effect for effect in effects if not effect.advance(frame_ms)]
+            self.effects = still_running + self.effects
+
+    def active(self):
+        return bool(self.effects)
+
+    def clear(self):
+        self.effects = []
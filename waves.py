@@ -0,0 +1,127 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+from collections import namedtuple
+
+# Difficulty and spawn settings, loaded from waves.json instead of being written into
+# the engine. "levels" is the level table: the score that reaches each level, its bird
+# spawn interval and speed, how many clouds may be on screen, the cloud burst interval
+# and size, and whether the LEVEL UP banner is shown. Levels past the table repeat the
+# last row plus "ramp" per level, kept inside "limits". "birds", "clouds" and "hearts"
+# hold the spawn settings that do not change with the level.
+#
+#   python waves.py                                       print the level table
+#   python waves.py --timeline --seed 7 --seconds 120     spawn timeline of one headless game
+
+# next to this module, so engines work from any working directory
+WAVES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'waves.json')
+RAMPED = ('score', 'bird_interval', 'bird_speed', 'max_clouds', 'cloud_interval')
+
+Level = namedtuple('Level', 'number score bird_interval bird_speed max_clouds cloud_interval cloud_burst banner')
+
+
+class Waves:
+    def __init__(self, config):
+        self.levels = [
+            Level(number, row['score'], row['bird_interval'], row['bird_speed'], row['max_clouds'],
+                  row['cloud_interval'], tuple(row['cloud_burst']), row.get('banner', False))
+            for number, row in enumerate(config['levels'])
+        ]
+        self.ramp = config.get('ramp', {})
+        self.limits = config.get('limits', {})
+        self.birds = config['birds']
+        self.clouds = config['clouds']
+        self.hearts = config['hearts']
+        # scores at which the LEVEL UP banner shows
+        self.banner_scores = frozenset(level.score for level in self.levels if level.banner)
+        self.ramped = {}
+        # identifies the rule set, e.g. in recordings; any edit to the table changes it
+        self.digest = hashlib.sha1(json.dumps(config, sort_keys=True).encode()).digest()[:8]
+
+    def level(self, number):
+        if number < len(self.levels):
+            return self.levels[number]
+        level = self.ramped.get(number)
+        if level is None:
+            last = self.levels[-1]
+            steps = number - last.number
+            values = {name: self.clamp(name, getattr(last, name) + self.ramp.get(name, 0) * steps) for name in RAMPED}
+            level = self.ramped[number] = last._replace(number=number, banner=False, **values)
+        return level
+
+    def clamp(self, name, value):
+        low, high = self.limits.get(name, (None, None))
+        if low is not None:
+            value = max(low, value)
+        if high is not None:
+            value = min(high, value)
+        return value
+
+
+_loaded = {}
+
+
+# Parsed once per path; engines share the result
+def load_waves(path=WAVES_PATH):
+    waves = _loaded.get(path)
+    if waves is None:
+        with open(path) as f:
+            waves = _loaded[path] = Waves(json.load(f))
+    return waves
+
+
+def print_levels(waves, count):
+    print(f"{'level':>5} {'score':>6} {'bird ms':>8} {'birds/min':>10} {'speed':>6} {'clouds':>7} {'cloud ms':>9} {'burst':>6}  banner")
+    for number in range(count):
+        level = waves.level(number)
+        burst = f'{level.cloud_burst[0]}-{level.cloud_burst[1]}'
+        print(f"{number:>5} {level.score:>6} {level.bird_interval:>8} {60000 / level.bird_interval:>10.1f} {level.bird_speed:>6} "
+              f"{level.max_clouds:>7} {level.cloud_interval:>9} {burst:>6}  {'yes' if level.banner else ''}")
+
+
+# Play one headless game with a batch_runner policy and list every spawn it made
+def print_timeline(waves, seed, policy_name, seconds):
+    import random
+    from engine import GameEngine
+    from batch_runner import POLICIES
+    engine = GameEngine(waves=waves)
+    engine.reset(seed)
+    engine.spawn_log = []
+    policy, rng = POLICIES[policy_name], random.Random(seed ^ 0x5EED)
+    while not engine.game_over and engine.time < seconds * 1000:
+        engine.step(policy(engine, rng))
+
+    print(f"{'time s':>8} {'level':>5}  spawn")
+    for time_ms, level, kind, count in engine.spawn_log:
+        print(f"{time_ms / 1000:>8.2f} {level:>5}  {kind}" + (f' x{count}' if count > 1 else ''))
+    totals = {}
+    for _, level, kind, count in engine.spawn_log:
+        totals.setdefault(level, {}).setdefault(kind, 0)
+        totals[level][kind] += count
+    print(f"\nseed {seed}, {policy_name} policy: {'died' if engine.game_over else 'alive'} at {engine.time / 1000:.1f}s, score {engine.player.score}")
+    for level, kinds in sorted(totals.items()):
+        print(f"level {level}: " + ', '.join(f'{count} {kind}' for kind, count in sorted(kinds.items())))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Inspect the difficulty table and spawn timeline offline.')
+    parser.add_argument('--config', default=WAVES_PATH)
+    parser.add_argument('--levels', type=int, default=12, help='rows of the level table to print')
+    parser.add_argument('--timeline', action='store_true', help='print the spawns of one headless game')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--policy', default='scripted')
+    parser.add_argument('--seconds', type=float, default=120)
+    args = parser.parse_args(argv)
+
+    waves = load_waves(args.config)
+    if args.timeline:
+        print_timeline(waves, args.seed, args.policy, args.seconds)
+    else:
+        print_levels(waves, args.levels)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+import pygame
+from assets import global_asset_manager as assets
+
+# Shared UI widgets for the menu, settings, gameplay settings and game-over screens.
+# Fonts are shared through a (path, size) cache, and every widget pre-renders the
+# surfaces it needs per visual state, so drawing a widget is a blit or two.
+
+_fonts = {}
+
+
+def get_font(path, size):
+    font = _fonts.get((path, size))
+    if font is None:
+        font = _fonts[(path, size)] = pygame.font.Font(path, size)
+    return font
+
+
+_labels = {}
+
+
+# Rendered text shared by every widget that shows the same label in the same font
+def render_label(font, text, color, max_width=None):
+    key = (id(font), text, color, max_width)
+    surface = _labels.get(key)
+    if surface is None:
+        surface = font.render(text, True, color)
+        if max_width is not None and surface.get_width() > max_width:
+            surface = font.render(truncate_text(font, text, max_width), True, color)
+        _labels[key] = surface
+    return surface
+
+
+def truncate_text(font, text, max_width, ellipsis="..."):
+    for i in range(len(text), 0, -1):
+        short_text = text[:i] + ellipsis
+        if font.size(short_text)[0] <= max_width:
+            return short_text
+    return ellipsis
+
+
+# Button with configurable font and background colour and optional icon.
+# With an icon and no text only the icon is drawn; with both, the icon sits on the left.
+class Button:
+    def __init__(self, text, pos, size, font_path, callback, font_size=26, text_color=(255, 255, 255), bg_color=(155, 89, 182), hover_color=(175, 115, 205), icon_path=None):
+        self.text = text
+        self.rect = pygame.Rect(0, 0, *size)
+        self.rect.center = pos
+        self.callback = callback
+        self.font = get_font(font_path, font_size) if font_path else None
+        self.text_color = text_color
+        self.bg_color = bg_color
+        self.hover_color = hover_color
+        self.icon = None
+        self.surfaces = {}
+
+        if icon_path:
+            icon_size = min(self.rect.width - 10, self.rect.height - 10) if not text else self.rect.height - 10
+            try:
+                self.icon = assets.image(icon_path, size=(icon_size, icon_size))
+            except (pygame.error, FileNotFoundError):
+                print(f"Could not load icon: {icon_path}")
+
+    def is_hovered(self):
+        return self.rect.collidepoint(pygame.mouse.get_pos())
+
+    def _render(self, hovered):
+        local = self.rect.copy()
+        local.topleft = (0, 0)
+        if self.icon and not self.text:
+            surface = pygame.Surface(local.size, pygame.SRCALPHA)
+            surface.blit(self.icon, self.icon.get_rect(center=local.center))
+            return surface
+
+        surface = pygame.Surface(local.size).convert()
+        surface.fill(self.hover_color if hovered else self.bg_color)
+        pygame.draw.rect(surface, (0, 0, 0), local, 2)
+        if self.icon:
+            icon_rect = self.icon.get_rect(midleft=(local.left + 5, local.centery))
+            surface.blit(self.icon, icon_rect)
+            if self.text and self.font:
+                text_surf = render_label(self.font, self.text, self.text_color)
+                surface.blit(text_surf, text_surf.get_rect(midleft=(icon_rect.right + 10, local.centery)))
+        elif self.text and self.font:
+            text_surf = render_label(self.font, self.text, self.text_color)
+            surface.blit(text_surf, text_surf.get_rect(center=local.center))
+        return surface
+
+    def draw(self, surface):
+        hovered = self.is_hovered()
+        image = self.surfaces.get(hovered)
+        if image is None:
+            image = self.surfaces[hovered] = self._render(hovered)
+        surface.blit(image, self.rect)
+
+    def check_click(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and self.rect.collidepoint(event.pos):
+            self.callback()
+
+
+class ToggleButton:
+    def __init__(self, pos, size, font_path, initial_state=True, callback=None):
+        self.rect = pygame.Rect(pos[0], pos[1], size[0], size[1])
+        self.state = initial_state
+        self.callback = callback
+        self.font = get_font(font_path, 26)
+        self.text_color = (255, 255, 255)
+        self.surfaces = {}
+
+    def _render(self, state):
+        local = pygame.Rect((0, 0), self.rect.size)
+        surface = pygame.Surface(local.size, pygame.SRCALPHA)
+        bg_color = (46, 204, 113) if state else (192, 57, 43)
+        pygame.draw.rect(surface, bg_color, local, border_radius=20)
+        pygame.draw.rect(surface, (0, 0, 0), local, 3, border_radius=20)
+
+        knob_radius = local.height // 2 - 5
+        knob_x = local.left + knob_radius + 5 if not state else local.right - knob_radius - 5
+        pygame.draw.circle(surface, (255, 255, 255), (knob_x, local.centery), knob_radius)
+        return surface
+
+    def draw(self, surface, label, label_pos, label_max_width):
+        text_surf = render_label(self.font, label, self.text_color, label_max_width)
+        surface.blit(text_surf, text_surf.get_rect(midleft=label_pos))
+
+        image = self.surfaces.get(self.state)
+        if image is None:
+            image = self.surfaces[self.state] = self._render(self.state)
+        surface.blit(image, self.rect)
+
+    # Area the toggle and its label occupy, for dirty-rect redraws
+    def area(self, label_pos):
+        label_height = self.font.get_linesize()
+        label_rect = pygame.Rect(label_pos[0], label_pos[1] - label_height // 2, self.rect.left - label_pos[0], label_height)
+        return label_rect.union(self.rect)
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and self.rect.collidepoint(event.pos):
+            self.state = not self.state
+            if self.callback:
+                self.callback(self.state)